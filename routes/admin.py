@@ -6,7 +6,7 @@ Handles admin operations for site management
 from flask import Blueprint, request, jsonify, render_template
 from services.warning_service import WarningService
 from services.chatbot_service import ChatbotService
-from services.admin_log_service import AdminLogService
+from services.admin_log_service import get_admin_log_service
 from datetime import datetime, timedelta
 import os
 
@@ -15,7 +15,6 @@ admin_bp = Blueprint('admin', __name__)
 # Lazy initialization for services (avoids file writes during import in serverless environments)
 _warning_service = None
 _chatbot_service = None
-_admin_log_service = None
 
 def get_warning_service():
     """Get or create warning service (lazy initialization)"""
@@ -31,13 +30,6 @@ def get_chatbot_service():
         _chatbot_service = ChatbotService()
     return _chatbot_service
 
-def get_admin_log_service():
-    """Get or create admin log service (lazy initialization)"""
-    global _admin_log_service
-    if _admin_log_service is None:
-        _admin_log_service = AdminLogService()
-    return _admin_log_service
-
 def check_admin_auth(request):
     """Simple authentication check (can be enhanced later)"""
     # For now, just check if admin password is set in env
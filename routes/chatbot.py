@@ -3,7 +3,8 @@ Chatbot API routes for AI interaction.
 Easily expandable for different AI providers (OpenAI, Anthropic, etc.)
 """
 
-from flask import Blueprint, request, jsonify, send_file, make_response
+from flask import Blueprint, request, jsonify, send_file, make_response, Response, stream_with_context
+import json
 import os
 from datetime import datetime
 from services.chatbot_service import ChatbotService
@@ -17,7 +18,7 @@ except ImportError as e:
     PDFGenerator = None
     print(f"Warning: PDFGenerator not available: {e}")
 from services.conversation_history_service import ConversationHistoryService
-from services.admin_log_service import AdminLogService
+from services.admin_log_service import get_admin_log_service
 from services.weather_service import WeatherService
 from services.traffic_service import TrafficService
 
@@ -28,7 +29,6 @@ _chatbot_service = None
 _safety_template = None
 _pdf_generator = None
 _conversation_history_service = None
-_admin_log_service = None
 _weather_service = None
 _traffic_service = None
 
@@ -62,13 +62,6 @@ def get_conversation_history_service():
         _conversation_history_service = ConversationHistoryService()
     return _conversation_history_service
 
-def get_admin_log_service():
-    """Get or create admin log service (lazy initialization)"""
-    global _admin_log_service
-    if _admin_log_service is None:
-        _admin_log_service = AdminLogService()
-    return _admin_log_service
-
 def get_weather_service():
     """Get or create weather service (lazy initialization)"""
     global _weather_service
@@ -98,6 +91,65 @@ def get_client_ip():
         ip = request.remote_addr
     return ip
 
+def add_current_conditions(context):
+    """Add current Corpus Christi weather and a traffic summary to the chatbot context"""
+    weather_service = get_weather_service()
+    traffic_service = get_traffic_service()
+    
+    try:
+        weather_data = weather_service.get_forecast(CORPUS_CHRISTI_LAT, CORPUS_CHRISTI_LNG)
+    except Exception as e:
+        print(f"Error fetching weather data: {e}")
+        weather_data = None
+    
+    try:
+        traffic_data = traffic_service.get_traffic_data(CORPUS_CHRISTI_LAT, CORPUS_CHRISTI_LNG, radius_km=10.0)
+        construction_data = traffic_service.get_construction_data(CORPUS_CHRISTI_LAT, CORPUS_CHRISTI_LNG, radius_km=10.0)
+    except Exception as e:
+        print(f"Error fetching traffic data: {e}")
+        traffic_data = []
+        construction_data = []
+    
+    # Add weather and traffic info to context
+    if weather_data:
+        context['weather'] = weather_data
+    if traffic_data or construction_data:
+        # Summarize traffic conditions
+        busy_areas = []
+        if traffic_data:
+            # Find areas with high traffic intensity
+            high_traffic = [t for t in traffic_data if t.get('intensity', 0) > 0.6]
+            if high_traffic:
+                busy_areas.append(f"{len(high_traffic)} areas with heavy traffic")
+        if construction_data:
+            busy_areas.append(f"{len(construction_data)} active construction sites")
+        context['traffic_summary'] = {
+            'busy_areas': busy_areas,
+            'traffic_points': len(traffic_data),
+            'construction_sites': len(construction_data)
+        }
+
+def queue_batch_response(session_id, message, context, conversation_history, on_response):
+    """
+    Send a request through the Groq batch API instead of answering it now.
+    
+    on_response(batch_id, response) is called from a background thread once the batch
+    completes; it should store the response in the session's conversation history,
+    where GET /batch/<batch_id> looks for it.
+    
+    Returns:
+        Batch ID
+    """
+    chatbot_service = get_chatbot_service()
+    batch_id = chatbot_service.submit_batch([{
+        'custom_id': session_id,
+        'message': message,
+        'context': context,
+        'conversation_history': conversation_history
+    }])
+    chatbot_service.watch_batch(batch_id, lambda custom_id, response: on_response(batch_id, response))
+    return batch_id
+
 @chatbot_bp.route('/message', methods=['POST'])
 def send_message():
     """
@@ -107,7 +159,9 @@ def send_message():
     {
         "message": "user message here",
         "context": {},  # optional context for map/location data
-        "session_id": "default"  # optional session ID (default: "default")
+        "session_id": "default",  # optional session ID (default: "default")
+        "async_ok": true  # optional; general_safety_info requests are then answered via the
+                          # batch API and the route returns 202 with a batch_id to poll
     }
     """
     try:
@@ -119,6 +173,8 @@ def send_message():
         user_message = data.get('message')
         context = data.get('context', {})
         session_id = data.get('session_id', 'default')
+        if data.get('async_ok') is True:
+            context['async_ok'] = True
         
         # Check if this is a system-generated message (from safety popup, etc.)
         is_system_message = context.get('type') in ['general_safety_info'] or context.get('is_system_generated', False)
@@ -127,45 +183,12 @@ def send_message():
         client_ip = get_client_ip()
         
         # Get services (lazy initialization)
-        weather_service = get_weather_service()
-        traffic_service = get_traffic_service()
         conversation_history_service = get_conversation_history_service()
         chatbot_service = get_chatbot_service()
         admin_log_service = get_admin_log_service()
         
         # Fetch current weather and traffic conditions for Corpus Christi
-        try:
-            weather_data = weather_service.get_forecast(CORPUS_CHRISTI_LAT, CORPUS_CHRISTI_LNG)
-        except Exception as e:
-            print(f"Error fetching weather data: {e}")
-            weather_data = None
-        
-        try:
-            traffic_data = traffic_service.get_traffic_data(CORPUS_CHRISTI_LAT, CORPUS_CHRISTI_LNG, radius_km=10.0)
-            construction_data = traffic_service.get_construction_data(CORPUS_CHRISTI_LAT, CORPUS_CHRISTI_LNG, radius_km=10.0)
-        except Exception as e:
-            print(f"Error fetching traffic data: {e}")
-            traffic_data = []
-            construction_data = []
-        
-        # Add weather and traffic info to context
-        if weather_data:
-            context['weather'] = weather_data
-        if traffic_data or construction_data:
-            # Summarize traffic conditions
-            busy_areas = []
-            if traffic_data:
-                # Find areas with high traffic intensity
-                high_traffic = [t for t in traffic_data if t.get('intensity', 0) > 0.6]
-                if high_traffic:
-                    busy_areas.append(f"{len(high_traffic)} areas with heavy traffic")
-            if construction_data:
-                busy_areas.append(f"{len(construction_data)} active construction sites")
-            context['traffic_summary'] = {
-                'busy_areas': busy_areas,
-                'traffic_points': len(traffic_data),
-                'construction_sites': len(construction_data)
-            }
+        add_current_conditions(context)
         
         # Load conversation history for this session (exclude system-generated messages)
         conversation_history = conversation_history_service.get_conversation_history(session_id, exclude_system=True)
@@ -188,6 +211,42 @@ def send_message():
                 metadata={**context, 'is_system_generated': True}
             )
         
+        def log_interaction(response):
+            """Log to admin log with IP address"""
+            try:
+                admin_log_service.log_interaction(
+                    ip_address=client_ip,
+                    user_message=user_message,
+                    assistant_response=response,
+                    session_id=session_id,
+                    interaction_type='message',
+                    metadata={'context': context}
+                )
+            except Exception as log_error:
+                # Log errors but don't break the chatbot response
+                print(f"Error logging interaction to admin log: {log_error}")
+                import traceback
+                traceback.print_exc()
+        
+        # Non-interactive callers can opt into the cheaper batch API; the response is
+        # added to the session's conversation history when the batch completes
+        if chatbot_service.is_batchable(context):
+            def on_batch_response(batch_id, response):
+                conversation_history_service.add_message(
+                    session_id=session_id,
+                    role='assistant',
+                    content=response,
+                    metadata={'context': context, 'batch_id': batch_id}
+                )
+                log_interaction(response)
+            
+            batch_id = queue_batch_response(session_id, user_message, context, conversation_history, on_batch_response)
+            return jsonify({
+                'status': 'queued',
+                'batch_id': batch_id,
+                'session_id': session_id
+            }), 202
+        
         # Get response from chatbot service with conversation history
         response = chatbot_service.get_response(
             user_message, 
@@ -203,21 +262,7 @@ def send_message():
             metadata={'context': context}
         )
         
-        # Log to admin log with IP address
-        try:
-            admin_log_service.log_interaction(
-                ip_address=client_ip,
-                user_message=user_message,
-                assistant_response=response,
-                session_id=session_id,
-                interaction_type='message',
-                metadata={'context': context}
-            )
-        except Exception as log_error:
-            # Log errors but don't break the chatbot response
-            print(f"Error logging interaction to admin log: {log_error}")
-            import traceback
-            traceback.print_exc()
+        log_interaction(response)
         
         # Get updated conversation history for response (exclude system messages)
         updated_history = conversation_history_service.get_conversation_history(session_id, exclude_system=True)
@@ -235,6 +280,87 @@ def send_message():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@chatbot_bp.route('/message/stream', methods=['POST'])
+def stream_message():
+    """
+    Handle chatbot messages, streaming the response as server-sent events.
+    
+    Expects the same JSON as /message. Emits `data: {"delta": "..."}` events while the
+    response is generated, then one `data: {"done": true, "response": "...", "session_id": "..."}`
+    event whose response is the final text (it replaces the streamed text if the
+    response was rejected by the prompt sandbox). If the stream fails part way, the
+    final event is `data: {"done": true, "error": "...", "session_id": "..."}` instead.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'message' not in data:
+            return jsonify({'error': 'Message is required'}), 400
+        
+        user_message = data.get('message')
+        context = data.get('context', {})
+        session_id = data.get('session_id', 'default')
+        is_system_message = context.get('type') in ['general_safety_info'] or context.get('is_system_generated', False)
+        client_ip = get_client_ip()
+        
+        conversation_history_service = get_conversation_history_service()
+        chatbot_service = get_chatbot_service()
+        admin_log_service = get_admin_log_service()
+        
+        add_current_conditions(context)
+        
+        conversation_history = conversation_history_service.get_conversation_history(session_id, exclude_system=True)
+        conversation_history_service.add_message(
+            session_id=session_id,
+            role='user',
+            content=user_message,
+            metadata={**context, 'is_system_generated': True} if is_system_message else context
+        )
+    
+    except Exception as e:
+        print(f"Chatbot error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        try:
+            for event in chatbot_service.stream_response(user_message, context, conversation_history=conversation_history):
+                if event.get('done'):
+                    response = event['response']
+                    conversation_history_service.add_message(
+                        session_id=session_id,
+                        role='assistant',
+                        content=response,
+                        metadata={'context': context}
+                    )
+                    try:
+                        admin_log_service.log_interaction(
+                            ip_address=client_ip,
+                            user_message=user_message,
+                            assistant_response=response,
+                            session_id=session_id,
+                            interaction_type='message',
+                            metadata={'context': context}
+                        )
+                    except Exception as log_error:
+                        print(f"Error logging interaction to admin log: {log_error}")
+                    event = {**event, 'session_id': session_id}
+                yield f"data: {json.dumps(event)}\n\n"
+        
+        except Exception as e:
+            # Headers are already sent, so report the failure as the final event
+            print(f"Chatbot stream error: {e}")
+            import traceback
+            traceback.print_exc()
+            yield f"data: {json.dumps({'done': True, 'error': str(e), 'session_id': session_id})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @chatbot_bp.route('/safety-evaluation', methods=['POST'])
 def safety_evaluation():
     """
@@ -250,7 +376,9 @@ def safety_evaluation():
                 ...
             },
             "questions": ["question 1", "question 2", ...]
-        }
+        },
+        "async_ok": true  # optional; the evaluation is then answered via the batch API and
+                          # the route returns 202 with a batch_id to poll
     }
     """
     try:
@@ -299,6 +427,8 @@ def safety_evaluation():
             'type': 'safety_evaluation',
             'stats': stats
         }
+        if data.get('async_ok') is True:
+            context['async_ok'] = True
         
         # Log evaluation as user message
         conversation_history_service.add_message(
@@ -316,6 +446,48 @@ def safety_evaluation():
         # Get client IP address
         client_ip = get_client_ip()
         
+        def log_evaluation(response):
+            """Log to admin log with IP address"""
+            try:
+                admin_log_service.log_interaction(
+                    ip_address=client_ip,
+                    user_message=f"Safety Evaluation Request for Zipcode {evaluation_data.get('zipcode')}",
+                    assistant_response=response,
+                    session_id=session_id,
+                    interaction_type='safety_evaluation',
+                    metadata={
+                        'zipcode': evaluation_data.get('zipcode'),
+                        'stats': stats,
+                        'context': context
+                    }
+                )
+            except Exception as log_error:
+                # Log errors but don't break the chatbot response
+                print(f"Error logging safety evaluation to admin log: {log_error}")
+                import traceback
+                traceback.print_exc()
+        
+        # Non-interactive callers can opt into the cheaper batch API; the evaluation is
+        # added to the session's conversation history when the batch completes
+        if chatbot_service.is_batchable(context):
+            def on_batch_response(batch_id, response):
+                conversation_history_service.add_message(
+                    session_id=session_id,
+                    role='assistant',
+                    content=response,
+                    metadata={'context': context, 'type': 'safety_evaluation', 'batch_id': batch_id}
+                )
+                log_evaluation(response)
+            
+            batch_id = queue_batch_response(session_id, prompt, context, conversation_history, on_batch_response)
+            return jsonify({
+                'status': 'queued',
+                'batch_id': batch_id,
+                'stats': stats,
+                'zipcode': evaluation_data.get('zipcode'),
+                'session_id': session_id
+            }), 202
+        
         # Get response with conversation history
         response = chatbot_service.get_response(prompt, context, conversation_history=conversation_history)
         
@@ -327,25 +499,7 @@ def safety_evaluation():
             metadata={'context': context, 'type': 'safety_evaluation'}
         )
         
-        # Log to admin log with IP address
-        try:
-            admin_log_service.log_interaction(
-                ip_address=client_ip,
-                user_message=f"Safety Evaluation Request for Zipcode {evaluation_data.get('zipcode')}",
-                assistant_response=response,
-                session_id=session_id,
-                interaction_type='safety_evaluation',
-                metadata={
-                    'zipcode': evaluation_data.get('zipcode'),
-                    'stats': stats,
-                    'context': context
-                }
-            )
-        except Exception as log_error:
-            # Log errors but don't break the chatbot response
-            print(f"Error logging safety evaluation to admin log: {log_error}")
-            import traceback
-            traceback.print_exc()
+        log_evaluation(response)
         
         print(f"Response generated, length: {len(response)} characters")
         
@@ -365,6 +519,41 @@ def safety_evaluation():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@chatbot_bp.route('/batch/<batch_id>', methods=['GET'])
+def batch_result(batch_id):
+    """
+    Get the response to a request that was queued with async_ok.
+    
+    Query params:
+        session_id: Session ID returned with the batch_id
+    
+    Returns the response once the batch has completed, otherwise 202 with status 'queued'.
+    """
+    try:
+        session_id = request.args.get('session_id')
+        if not session_id:
+            return jsonify({'error': 'session_id is required'}), 400
+        
+        # Batch responses are stored in the session's conversation history, tagged with the batch ID
+        history = get_conversation_history_service().get_conversation_history(session_id, exclude_system=False)
+        for msg in reversed(history):
+            if msg.get('role') == 'assistant' and msg.get('metadata', {}).get('batch_id') == batch_id:
+                return jsonify({
+                    'response': msg['content'],
+                    'status': 'success',
+                    'batch_id': batch_id,
+                    'session_id': session_id
+                })
+        
+        return jsonify({
+            'status': 'queued',
+            'batch_id': batch_id,
+            'session_id': session_id
+        }), 202
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @chatbot_bp.route('/download-pdf', methods=['POST'])
 def download_pdf():
     """
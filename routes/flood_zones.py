@@ -5,21 +5,16 @@ Handles flood zone overlay management
 
 import os
 from flask import Blueprint, request, jsonify
-from services.flood_zone_service import FloodZoneService
+from services.flood_zone_service import get_flood_zone_service as get_shared_flood_zone_service
 
 flood_zones_bp = Blueprint('flood_zones', __name__)
 
-# Lazy initialization for services (avoids file writes during import in serverless environments)
-_flood_zone_service = None
+FLOOD_ZONES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'flood_zones.json')
 
+# Lazy initialization for services (avoids file writes during import in serverless environments)
 def get_flood_zone_service():
-    """Get or create flood zone service (lazy initialization)"""
-    global _flood_zone_service
-    if _flood_zone_service is None:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        flood_zones_file = os.path.join(project_root, 'flood_zones.json')
-        _flood_zone_service = FloodZoneService(db_file=flood_zones_file)
-    return _flood_zone_service
+    """Get or create the process-wide flood zone service (lazy initialization)"""
+    return get_shared_flood_zone_service(FLOOD_ZONES_FILE)
 
 @flood_zones_bp.route('/all', methods=['GET'])
 def get_all_zones():
@@ -1,16 +1,36 @@
 """
 Script to create realistic dummy warnings for Corpus Christi
+
+Requirements:
+    pip install numpy
+    pip install orjson  # optional, faster JSON output
 """
 
+import hashlib
+import itertools
 import json
-import random
-from datetime import datetime, timedelta
+from collections import Counter
+from dataclasses import dataclass, asdict
+import numpy as np
+from datetime import datetime
 from pathlib import Path
 import sys
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Seeded output is cached per script version, so editing this file invalidates old caches
+SCRIPT_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
+# DummyWarning fields holding times, shifted to the current time when a cache is reused
+TIME_FIELDS = ('timestamp', 'expiry_time', 'created_at')
+
 # Corpus Christi area coordinates - land-based only
 # Define reasonable bounds for Corpus Christi land area
 LAT_MIN = 27.65  # South boundary (avoid water)
@@ -18,43 +38,154 @@ LAT_MAX = 27.87  # North boundary
 LNG_MIN = -97.55  # West boundary
 LNG_MAX = -97.25  # East boundary (avoid bay/ocean)
 
-# Areas to avoid (water/bay)
-WATER_AREAS = [
+# Areas to avoid (water/bay), one row per rectangle: lat_min, lat_max, lng_min, lng_max
+WATER_AREAS = np.array([
     # Corpus Christi Bay (east)
-    {"lat_min": 27.75, "lat_max": 27.85, "lng_min": -97.15, "lng_max": -97.05},
+    [27.75, 27.85, -97.15, -97.05],
     # Oso Bay (southeast)
-    {"lat_min": 27.65, "lat_max": 27.72, "lng_min": -97.35, "lng_max": -97.25},
+    [27.65, 27.72, -97.35, -97.25],
     # Laguna Madre (south)
-    {"lat_min": 27.60, "lat_max": 27.68, "lng_min": -97.35, "lng_max": -97.20},
+    [27.60, 27.68, -97.35, -97.20],
+])
+
+# Corpus Christi locations - verified land-based locations only
+LOCATIONS = [
+    {"name": "IH-37 at SH-359", "lat": 27.7564, "lng": -97.4042},
+    {"name": "IH-37 at Weber Road", "lat": 27.7834, "lng": -97.4132},
+    {"name": "IH-37 at SPID", "lat": 27.7225, "lng": -97.3956},
+    {"name": "IH-37 at Ayers Street", "lat": 27.7912, "lng": -97.4215},
+    {"name": "US-181 at SH-361", "lat": 27.7134, "lng": -97.3718},
+    {"name": "US-181 at Port Avenue", "lat": 27.7345, "lng": -97.3829},
+    {"name": "SPID at Staples Street", "lat": 27.7089, "lng": -97.3934},
+    {"name": "SPID at Airline Road", "lat": 27.7167, "lng": -97.4012},
+    {"name": "SPID at Everhart Road", "lat": 27.7398, "lng": -97.3887},
+    {"name": "SPID at Rodd Field Road", "lat": 27.7523, "lng": -97.3912},
+    {"name": "IH-37 at Navigation Boulevard", "lat": 27.8045, "lng": -97.4298},
+    {"name": "IH-37 at Leopard Street", "lat": 27.7987, "lng": -97.4221},
+    {"name": "IH-37 at Kostoryz Road", "lat": 27.7765, "lng": -97.4123},
+    {"name": "SPID at Padre Island Drive", "lat": 27.7156, "lng": -97.3945},
+    {"name": "US-181 at Ocean Drive", "lat": 27.7289, "lng": -97.3776},
+    {"name": "Downtown Corpus Christi", "lat": 27.8006, "lng": -97.3964},
+    {"name": "Port of Corpus Christi Area", "lat": 27.8167, "lng": -97.4376},
+    {"name": "Airport Area", "lat": 27.7734, "lng": -97.5076},
+    {"name": "Southside Corpus Christi", "lat": 27.6856, "lng": -97.3456},
+    {"name": "North Beach Area", "lat": 27.8123, "lng": -97.3876},
+    {"name": "Cole Park Area", "lat": 27.7889, "lng": -97.4012},
+    {"name": "Central City Area", "lat": 27.7923, "lng": -97.4023},
+    {"name": "Weber Road Area", "lat": 27.7856, "lng": -97.4145},
+    {"name": "Saratoga Boulevard Area", "lat": 27.7645, "lng": -97.4089},
+    {"name": "McArdle Road Area", "lat": 27.7521, "lng": -97.3956},
+    {"name": "Doddridge Street Area", "lat": 27.7432, "lng": -97.3876},
+    {"name": "Morgan Avenue Area", "lat": 27.7309, "lng": -97.3789},
+    {"name": "Williams Drive Area", "lat": 27.7187, "lng": -97.3891},
+    {"name": "Horizon Boulevard Area", "lat": 27.7023, "lng": -97.4012},
+    {"name": "Yorktown Boulevard Area", "lat": 27.7654, "lng": -97.4156},
 ]
 
+# Struct-of-arrays view of LOCATIONS for vectorized sampling
+LOC_LAT = np.array([l["lat"] for l in LOCATIONS])
+LOC_LNG = np.array([l["lng"] for l in LOCATIONS])
+LOC_NAME = [l["name"] for l in LOCATIONS]
+
+@dataclass(slots=True)
+class DummyWarning:
+    """A generated warning record, in the same shape as warnings.json entries"""
+    id: int
+    title: str
+    types: list
+    location: dict
+    timestamp: str
+    expiry_time: str
+    created_at: str
+
+def _land_mask(lat, lng):
+    """Exact land check over NumPy arrays; used to rasterize LAND_GRID"""
+    valid = (lat >= LAT_MIN) & (lat <= LAT_MAX) & (lng >= LNG_MIN) & (lng <= LNG_MAX)
+    
+    # Broadcast every point against all water rectangles at once
+    lat_w = np.expand_dims(lat, -1)
+    lng_w = np.expand_dims(lng, -1)
+    in_water = ((WATER_AREAS[:, 0] <= lat_w) & (lat_w <= WATER_AREAS[:, 1]) &
+                (WATER_AREAS[:, 2] <= lng_w) & (lng_w <= WATER_AREAS[:, 3]))
+    valid &= ~in_water.any(axis=-1)
+    
+    # Additional checks for common water areas
+    # Corpus Christi Bay area (east of city)
+    valid &= ~((lng > -97.20) & (lat > 27.72))
+    # Beach/Padre Island area (too far east/south)
+    valid &= ~((lng > -97.15) | (lat < 27.62))
+    
+    return valid
+
+# Land/water raster over the bounds at ~0.001 degree (~100m) resolution,
+# classified by cell centre, so validity checks become a single array lookup
+GRID_RES = 0.001
+GRID_ROWS = round((LAT_MAX - LAT_MIN) / GRID_RES)
+GRID_COLS = round((LNG_MAX - LNG_MIN) / GRID_RES)
+LAND_GRID = _land_mask(
+    (LAT_MIN + (np.arange(GRID_ROWS) + 0.5) * GRID_RES)[:, None],
+    (LNG_MIN + (np.arange(GRID_COLS) + 0.5) * GRID_RES)[None, :],
+)
+
 def is_valid_location(lat, lng):
     """Check if coordinates are on land and within reasonable bounds"""
-    # Check basic bounds
     if lat < LAT_MIN or lat > LAT_MAX or lng < LNG_MIN or lng > LNG_MAX:
         return False
     
-    # Check if in water areas
-    for water_area in WATER_AREAS:
-        if (water_area["lat_min"] <= lat <= water_area["lat_max"] and
-            water_area["lng_min"] <= lng <= water_area["lng_max"]):
-            return False
+    row = min(int((lat - LAT_MIN) / GRID_RES), GRID_ROWS - 1)
+    col = min(int((lng - LNG_MIN) / GRID_RES), GRID_COLS - 1)
+    return bool(LAND_GRID[row, col])
+
+def is_valid_location_np(lat, lng):
+    """Vectorized is_valid_location over NumPy arrays of coordinates"""
+    in_bounds = (lat >= LAT_MIN) & (lat <= LAT_MAX) & (lng >= LNG_MIN) & (lng <= LNG_MAX)
     
-    # Additional checks for common water areas
-    # Corpus Christi Bay area (east of city)
-    if lng > -97.20 and lat > 27.72:
-        return False
+    rows = np.clip(((lat - LAT_MIN) / GRID_RES).astype(int), 0, GRID_ROWS - 1)
+    cols = np.clip(((lng - LNG_MIN) / GRID_RES).astype(int), 0, GRID_COLS - 1)
+    return in_bounds & LAND_GRID[rows, cols]
+
+def jitter_locations(rng, count, spread=0.03, oversample=3):
+    """
+    Pick `count` random locations, each offset by up to `spread` degrees onto land.
     
-    # Beach/Padre Island area (too far east/south)
-    if lng > -97.15 or lat < 27.62:
-        return False
+    Uses bulk rejection sampling: draw `oversample` times as many (location, offset)
+    candidates as still needed, keep the ones on land and repeat until there are
+    enough. Returns (location indices, lats, lngs) as plain lists.
+    """
+    idx_parts, lat_parts, lng_parts = [], [], []
+    found = 0
+    while found < count:
+        n = (count - found) * oversample
+        idx = rng.integers(0, len(LOCATIONS), n)
+        offsets = rng.uniform(-spread, spread, (n, 2))
+        lat = LOC_LAT[idx] + offsets[:, 0]
+        lng = LOC_LNG[idx] + offsets[:, 1]
+        
+        valid = is_valid_location_np(lat, lng)
+        idx_parts.append(idx[valid])
+        lat_parts.append(lat[valid])
+        lng_parts.append(lng[valid])
+        found += int(valid.sum())
+    
+    loc_idx = np.concatenate(idx_parts)[:count]
+    lats = np.concatenate(lat_parts)[:count]
+    lngs = np.concatenate(lng_parts)[:count]
     
-    return True
+    return loc_idx.tolist(), np.round(lats, 6).tolist(), np.round(lngs, 6).tolist()
 
-def create_dummy_warnings():
-    """Create a ton of realistic dummy warnings"""
+def create_dummy_warnings(seed=None, now=None):
+    """
+    Create a ton of realistic dummy warnings, yielding them one at a time
     
-    warnings = []
+    Args:
+        seed: Optional RNG seed for a reproducible set of warnings
+        now: Optional datetime64 that warning ages are relative to (default: current time)
+    """
+    
+    warning_ids = itertools.count(1)
+    rng = np.random.default_rng(seed)
+    if now is None:
+        now = np.datetime64(datetime.now(), 'us')
     
     # Warning templates by type
     fire_warnings = [
@@ -120,249 +251,7 @@ def create_dummy_warnings():
         {"title": "Aircraft Emergency Landing", "desc": "Small aircraft making emergency landing on roadway. All lanes closed."},
     ]
     
-    # Corpus Christi locations - verified land-based locations only
-    locations = [
-        {"name": "IH-37 at SH-359", "lat": 27.7564, "lng": -97.4042},
-        {"name": "IH-37 at Weber Road", "lat": 27.7834, "lng": -97.4132},
-        {"name": "IH-37 at SPID", "lat": 27.7225, "lng": -97.3956},
-        {"name": "IH-37 at Ayers Street", "lat": 27.7912, "lng": -97.4215},
-        {"name": "US-181 at SH-361", "lat": 27.7134, "lng": -97.3718},
-        {"name": "US-181 at Port Avenue", "lat": 27.7345, "lng": -97.3829},
-        {"name": "SPID at Staples Street", "lat": 27.7089, "lng": -97.3934},
-        {"name": "SPID at Airline Road", "lat": 27.7167, "lng": -97.4012},
-        {"name": "SPID at Everhart Road", "lat": 27.7398, "lng": -97.3887},
-        {"name": "SPID at Rodd Field Road", "lat": 27.7523, "lng": -97.3912},
-        {"name": "IH-37 at Navigation Boulevard", "lat": 27.8045, "lng": -97.4298},
-        {"name": "IH-37 at Leopard Street", "lat": 27.7987, "lng": -97.4221},
-        {"name": "IH-37 at Kostoryz Road", "lat": 27.7765, "lng": -97.4123},
-        {"name": "SPID at Padre Island Drive", "lat": 27.7156, "lng": -97.3945},
-        {"name": "US-181 at Ocean Drive", "lat": 27.7289, "lng": -97.3776},
-        {"name": "Downtown Corpus Christi", "lat": 27.8006, "lng": -97.3964},
-        {"name": "Port of Corpus Christi Area", "lat": 27.8167, "lng": -97.4376},
-        {"name": "Airport Area", "lat": 27.7734, "lng": -97.5076},
-        {"name": "Southside Corpus Christi", "lat": 27.6856, "lng": -97.3456},
-        {"name": "North Beach Area", "lat": 27.8123, "lng": -97.3876},
-        {"name": "Cole Park Area", "lat": 27.7889, "lng": -97.4012},
-        {"name": "Central City Area", "lat": 27.7923, "lng": -97.4023},
-        {"name": "Weber Road Area", "lat": 27.7856, "lng": -97.4145},
-        {"name": "Saratoga Boulevard Area", "lat": 27.7645, "lng": -97.4089},
-        {"name": "McArdle Road Area", "lat": 27.7521, "lng": -97.3956},
-        {"name": "Doddridge Street Area", "lat": 27.7432, "lng": -97.3876},
-        {"name": "Morgan Avenue Area", "lat": 27.7309, "lng": -97.3789},
-        {"name": "Williams Drive Area", "lat": 27.7187, "lng": -97.3891},
-        {"name": "Horizon Boulevard Area", "lat": 27.7023, "lng": -97.4012},
-        {"name": "Yorktown Boulevard Area", "lat": 27.7654, "lng": -97.4156},
-    ]
-    
-    warning_id = 1
-    
-    # Create fire warnings (20)
-    for i in range(20):
-        loc = random.choice(locations)
-        warning = random.choice(fire_warnings)
-        # Add slight random offset to coordinates, but ensure it's on land
-        max_attempts = 10
-        lat = None
-        lng = None
-        for attempt in range(max_attempts):
-            lat = loc["lat"] + random.uniform(-0.03, 0.03)
-            lng = loc["lng"] + random.uniform(-0.03, 0.03)
-            if is_valid_location(lat, lng):
-                break
-        if not is_valid_location(lat, lng):
-            # Use original location if we can't find valid offset
-            lat = loc["lat"]
-            lng = loc["lng"]
-        
-        timestamp = datetime.now() - timedelta(hours=random.randint(0, 48))
-        expiry = timestamp + timedelta(hours=random.randint(6, 72))
-        
-        warnings.append({
-            "id": warning_id,
-            "title": warning["title"],
-            "types": ["fire"],
-            "location": {
-                "lat": round(lat, 6),
-                "lng": round(lng, 6),
-                "name": loc["name"]
-            },
-            "timestamp": timestamp.isoformat(),
-            "expiry_time": expiry.isoformat(),
-            "created_at": timestamp.isoformat()
-        })
-        warning_id += 1
-    
-    # Create car crash warnings (25)
-    for i in range(25):
-        loc = random.choice(locations)
-        warning = random.choice(car_crash_warnings)
-        max_attempts = 10
-        lat = None
-        lng = None
-        for attempt in range(max_attempts):
-            lat = loc["lat"] + random.uniform(-0.03, 0.03)
-            lng = loc["lng"] + random.uniform(-0.03, 0.03)
-            if is_valid_location(lat, lng):
-                break
-        if not is_valid_location(lat, lng):
-            lat = loc["lat"]
-            lng = loc["lng"]
-        
-        timestamp = datetime.now() - timedelta(hours=random.randint(0, 24))
-        expiry = timestamp + timedelta(hours=random.randint(2, 12))
-        
-        warnings.append({
-            "id": warning_id,
-            "title": warning["title"],
-            "types": ["car-crash"],
-            "location": {
-                "lat": round(lat, 6),
-                "lng": round(lng, 6),
-                "name": loc["name"]
-            },
-            "timestamp": timestamp.isoformat(),
-            "expiry_time": expiry.isoformat(),
-            "created_at": timestamp.isoformat()
-        })
-        warning_id += 1
-    
-    # Create road closure warnings (30)
-    for i in range(30):
-        loc = random.choice(locations)
-        warning = random.choice(road_closure_warnings)
-        max_attempts = 10
-        lat = None
-        lng = None
-        for attempt in range(max_attempts):
-            lat = loc["lat"] + random.uniform(-0.03, 0.03)
-            lng = loc["lng"] + random.uniform(-0.03, 0.03)
-            if is_valid_location(lat, lng):
-                break
-        if not is_valid_location(lat, lng):
-            lat = loc["lat"]
-            lng = loc["lng"]
-        
-        timestamp = datetime.now() - timedelta(hours=random.randint(0, 168))  # Last week
-        expiry = timestamp + timedelta(hours=random.randint(8, 240))  # Up to 10 days
-        
-        warnings.append({
-            "id": warning_id,
-            "title": warning["title"],
-            "types": ["road-closure"],
-            "location": {
-                "lat": round(lat, 6),
-                "lng": round(lng, 6),
-                "name": loc["name"]
-            },
-            "timestamp": timestamp.isoformat(),
-            "expiry_time": expiry.isoformat(),
-            "created_at": timestamp.isoformat()
-        })
-        warning_id += 1
-    
-    # Create flood warnings (15)
-    for i in range(15):
-        loc = random.choice(locations)
-        warning = random.choice(flood_warnings)
-        max_attempts = 10
-        lat = None
-        lng = None
-        for attempt in range(max_attempts):
-            lat = loc["lat"] + random.uniform(-0.03, 0.03)
-            lng = loc["lng"] + random.uniform(-0.03, 0.03)
-            if is_valid_location(lat, lng):
-                break
-        if not is_valid_location(lat, lng):
-            lat = loc["lat"]
-            lng = loc["lng"]
-        
-        timestamp = datetime.now() - timedelta(hours=random.randint(0, 36))
-        expiry = timestamp + timedelta(hours=random.randint(4, 48))
-        
-        warnings.append({
-            "id": warning_id,
-            "title": warning["title"],
-            "types": ["flood"],
-            "location": {
-                "lat": round(lat, 6),
-                "lng": round(lng, 6),
-                "name": loc["name"]
-            },
-            "timestamp": timestamp.isoformat(),
-            "expiry_time": expiry.isoformat(),
-            "created_at": timestamp.isoformat()
-        })
-        warning_id += 1
-    
-    # Create weather warnings (20)
-    for i in range(20):
-        loc = random.choice(locations)
-        warning = random.choice(weather_warnings)
-        max_attempts = 10
-        lat = None
-        lng = None
-        for attempt in range(max_attempts):
-            lat = loc["lat"] + random.uniform(-0.05, 0.05)
-            lng = loc["lng"] + random.uniform(-0.05, 0.05)
-            if is_valid_location(lat, lng):
-                break
-        if not is_valid_location(lat, lng):
-            lat = loc["lat"]
-            lng = loc["lng"]
-        
-        timestamp = datetime.now() - timedelta(hours=random.randint(0, 12))
-        expiry = timestamp + timedelta(hours=random.randint(2, 24))
-        
-        warnings.append({
-            "id": warning_id,
-            "title": warning["title"],
-            "types": ["weather"],
-            "location": {
-                "lat": round(lat, 6),
-                "lng": round(lng, 6),
-                "name": loc["name"]
-            },
-            "timestamp": timestamp.isoformat(),
-            "expiry_time": expiry.isoformat(),
-            "created_at": timestamp.isoformat()
-        })
-        warning_id += 1
-    
-    # Create other warnings (15)
-    for i in range(15):
-        loc = random.choice(locations)
-        warning = random.choice(other_warnings)
-        max_attempts = 10
-        lat = None
-        lng = None
-        for attempt in range(max_attempts):
-            lat = loc["lat"] + random.uniform(-0.03, 0.03)
-            lng = loc["lng"] + random.uniform(-0.03, 0.03)
-            if is_valid_location(lat, lng):
-                break
-        if not is_valid_location(lat, lng):
-            lat = loc["lat"]
-            lng = loc["lng"]
-        
-        timestamp = datetime.now() - timedelta(hours=random.randint(0, 24))
-        expiry = timestamp + timedelta(hours=random.randint(3, 36))
-        
-        warnings.append({
-            "id": warning_id,
-            "title": warning["title"],
-            "types": ["other"],
-            "location": {
-                "lat": round(lat, 6),
-                "lng": round(lng, 6),
-                "name": loc["name"]
-            },
-            "timestamp": timestamp.isoformat(),
-            "expiry_time": expiry.isoformat(),
-            "created_at": timestamp.isoformat()
-        })
-        warning_id += 1
-    
-    # Create some multi-type warnings (10)
+    # Multi-type warning templates
     multi_type_templates = [
         {"title": "Severe Storm Causing Multiple Hazards", "types": ["weather", "flood"], "desc": "Heavy rain causing flooding and reduced visibility. Multiple accidents reported."},
         {"title": "Accident During Road Work", "types": ["car-crash", "road-closure"], "desc": "Vehicle accident in active construction zone. Both emergency and construction crews on scene."},
@@ -376,74 +265,119 @@ def create_dummy_warnings():
         {"title": "Multi-Car Pileup in Construction Zone", "types": ["car-crash", "road-closure"], "desc": "Chain reaction accident in active work zone. Multiple injuries. Extended closure expected."},
     ]
     
-    for template in multi_type_templates:
-        loc = random.choice(locations)
-        max_attempts = 10
-        lat = None
-        lng = None
-        for attempt in range(max_attempts):
-            lat = loc["lat"] + random.uniform(-0.03, 0.03)
-            lng = loc["lng"] + random.uniform(-0.03, 0.03)
-            if is_valid_location(lat, lng):
-                break
-        if not is_valid_location(lat, lng):
-            lat = loc["lat"]
-            lng = loc["lng"]
-        
-        timestamp = datetime.now() - timedelta(hours=random.randint(0, 18))
-        expiry = timestamp + timedelta(hours=random.randint(6, 48))
-        
-        warnings.append({
-            "id": warning_id,
-            "title": template["title"],
-            "types": template["types"],
-            "location": {
-                "lat": round(lat, 6),
-                "lng": round(lng, 6),
-                "name": loc["name"]
-            },
-            "timestamp": timestamp.isoformat(),
-            "expiry_time": expiry.isoformat(),
-            "created_at": timestamp.isoformat()
-        })
-        warning_id += 1
+    # One row per warning category:
+    # (count, templates, types, spread, max age hours, min/max expiry hours)
+    # Templates with their own "types" (types=None) are each used exactly once.
+    categories = [
+        (20, fire_warnings, ["fire"], 0.03, 48, 6, 72),
+        (25, car_crash_warnings, ["car-crash"], 0.03, 24, 2, 12),
+        (30, road_closure_warnings, ["road-closure"], 0.03, 168, 8, 240),  # Last week, up to 10 days
+        (15, flood_warnings, ["flood"], 0.03, 36, 4, 48),
+        (20, weather_warnings, ["weather"], 0.05, 12, 2, 24),
+        (15, other_warnings, ["other"], 0.03, 24, 3, 36),
+        (len(multi_type_templates), multi_type_templates, None, 0.03, 18, 6, 48),
+    ]
     
-    return warnings
+    for count, templates, types, spread, max_age, min_ttl, max_ttl in categories:
+        loc_idx, lats, lngs = jitter_locations(rng, count, spread=spread)
+        age_hrs = rng.integers(0, max_age, count, endpoint=True).astype('timedelta64[h]')
+        ttl_hrs = rng.integers(min_ttl, max_ttl, count, endpoint=True).astype('timedelta64[h]')
+        timestamps = now - age_hrs
+        ts_iso = np.datetime_as_string(timestamps).tolist()
+        exp_iso = np.datetime_as_string(timestamps + ttl_hrs).tolist()
+        tpl_idx = rng.integers(0, len(templates), count).tolist() if types else range(count)
+        
+        for i in range(count):
+            template = templates[tpl_idx[i]]
+            
+            yield DummyWarning(
+                id=next(warning_ids),
+                title=template["title"],
+                types=types or template["types"],
+                location={
+                    "lat": lats[i],
+                    "lng": lngs[i],
+                    "name": LOC_NAME[loc_idx[i]]
+                },
+                timestamp=ts_iso[i],
+                expiry_time=exp_iso[i],
+                created_at=ts_iso[i]
+            )
 
-def main():
-    """Main function to create and save dummy warnings"""
-    print("Creating dummy warnings...")
-    print("Validating locations are on land only...")
-    
-    warnings = create_dummy_warnings()
+def _dumps(warning):
+    """Serialize one DummyWarning to JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        # orjson serializes dataclasses natively, without an asdict() copy
+        return orjson.dumps(warning)
+    return json.dumps(asdict(warning)).encode()
+
+def _cache_file(seed):
+    """Cache file for a seed's warnings, keyed on the script version"""
+    return Path(f'warnings_{seed}_{SCRIPT_HASH}.json')
+
+def _save_cache(cache_file, warnings, now):
+    """Cache generated warnings together with the time their ages are relative to"""
+    cache_file.write_text(json.dumps({
+        'generated_at': str(now),
+        'warnings': [asdict(w) for w in warnings]
+    }))
+
+def _load_cache(cache_file, now):
+    """
+    Load cached warnings, shifting their times by the time since they were generated
+    so every warning keeps the age and time to expiry it was drawn with
+    """
+    cached = json.loads(cache_file.read_bytes())
+    records = cached['warnings']
+    shift = now - np.datetime64(cached['generated_at'], 'us')
+    for field in TIME_FIELDS:
+        times = np.array([r[field] for r in records], dtype='datetime64[us]') + shift
+        for record, value in zip(records, np.datetime_as_string(times).tolist()):
+            record[field] = value
+    return [DummyWarning(**r) for r in records]
+
+def main(seed=None):
+    """
+    Main function to create and save dummy warnings
     
-    # Filter out any warnings that are still in invalid locations
-    valid_warnings = []
-    for warning in warnings:
-        lat = warning["location"]["lat"]
-        lng = warning["location"]["lng"]
-        if is_valid_location(lat, lng):
-            valid_warnings.append(warning)
-        else:
-            print(f"Filtered out warning {warning['id']}: {warning['title']} at ({lat}, {lng}) - in water/invalid area")
+    Args:
+        seed: Optional RNG seed. Seeded warnings are cached to warnings_<seed>_<script hash>.json
+              and reused, with their times moved up to the current time, on later runs
+              with the same seed.
+    """
+    warnings_file = Path('warnings.json')
+    cache_file = _cache_file(seed) if seed is not None else None
+    now = np.datetime64(datetime.now(), 'us')
     
-    warnings = valid_warnings
+    if cache_file is not None and cache_file.exists():
+        warnings = _load_cache(cache_file, now)
+        print(f"Reused cached dummy warnings for seed {seed} from {cache_file}")
+    else:
+        print("Creating dummy warnings...")
+        print("Validating locations are on land only...")
+        warnings = create_dummy_warnings(seed, now)
+        if cache_file is not None:
+            warnings = list(warnings)
+            _save_cache(cache_file, warnings, now)
     
-    # Save to warnings.json
-    warnings_file = Path('warnings.json')
+    # Save to warnings.json, streaming one record per line as they are generated.
+    # Coordinates are rejection-sampled onto land, so no second validation pass is needed
+    total = 0
+    type_counts = Counter()
     
-    with open(warnings_file, 'w') as f:
-        json.dump(warnings, f, indent=2)
+    with open(warnings_file, 'wb') as f:
+        f.write(b'[')
+        for warning in warnings:
+            f.write(b'\n  ' if total == 0 else b',\n  ')
+            f.write(_dumps(warning))
+            total += 1
+            type_counts.update(warning.types)
+        f.write(b'\n]\n')
     
-    print(f"\nCreated {len(warnings)} dummy warnings!")
+    print(f"\nCreated {total} dummy warnings!")
     print(f"Saved to: {warnings_file}")
     
     # Print summary
-    type_counts = {}
-    for warning in warnings:
-        for wtype in warning.get('types', []):
-            type_counts[wtype] = type_counts.get(wtype, 0) + 1
-    
     print("\nWarning type breakdown:")
     for wtype, count in sorted(type_counts.items()):
         print(f"  {wtype}: {count}")
@@ -451,5 +385,16 @@ def main():
     print("\nDone!")
 
 if __name__ == "__main__":
-    main()
-
+    seed = None
+    
+    # Allow an optional seed for reproducible (and cached) output
+    if len(sys.argv) > 1:
+        try:
+            seed = int(sys.argv[1])
+        except ValueError:
+            print(f"Invalid seed: {sys.argv[1]}")
+            print("Usage: python scripts/create_dummy_warnings.py [seed]")
+            print("  Example: python scripts/create_dummy_warnings.py 42")
+            sys.exit(1)
+    
+    main(seed)
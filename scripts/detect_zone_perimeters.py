@@ -11,11 +11,17 @@ This script:
 
 Requirements:
     pip install opencv-python numpy pillow
+    pip install numba  # optional, compiles the PIL fallback's edge scan
 """
 
+import hashlib
+import io
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
 import numpy as np
 from PIL import Image
 
@@ -27,46 +33,98 @@ except ImportError:
     print("WARNING: OpenCV not found. Using PIL-based edge detection (less accurate).")
     print("Install OpenCV for better results: pip install opencv-python")
 
-def detect_perimeter_opencv(image_path):
+try:
+    from scipy.spatial import cKDTree
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Contours with more points than this are further simplified with approxPolyDP
+MAX_CONTOUR_POINTS = 2000
+
+# Zone components larger than this (in either dimension) are downsampled before contour tracing
+MAX_TRACE_DIM = 1500
+
+def detect_perimeter_opencv(img):
     """
     Detect perimeter using OpenCV findContours (preferred method).
     
+    Args:
+        img: Image array as loaded by cv2.imread(..., cv2.IMREAD_UNCHANGED)
+    
     Returns:
         List of [x, y] pixel coordinates representing the perimeter contour
     """
-    # Load image
-    img = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
-    if img is None:
-        print(f"  ERROR: Could not load image {image_path}")
-        return None
-    
     # Extract alpha channel if present, otherwise use grayscale
-    if img.shape[2] == 4:
+    if img.ndim == 3 and img.shape[2] == 4:
         # RGBA image - use alpha channel
         alpha = img[:, :, 3]
-        # Create binary mask: 1 for colored pixels (alpha >= 10), 0 for transparent
-        mask = (alpha >= 10).astype(np.uint8) * 255
+        # Create binary mask: 255 for colored pixels (alpha >= 10), 0 for transparent
+        _, mask = cv2.threshold(alpha, 9, 255, cv2.THRESH_BINARY)
     else:
         # No alpha channel - assume all pixels are colored
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        mask = (gray > 0).astype(np.uint8) * 255
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY)
     
-    # Find contours
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # Label connected regions in one pass; stats holds each component's bbox and area
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    
+    if num_labels <= 1:
+        print("  WARNING: No contours found in image")
+        return None
+    
+    # Largest non-background component should be the main zone shape
+    idx = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    x, y, w, h = (int(v) for v in stats[idx, [cv2.CC_STAT_LEFT, cv2.CC_STAT_TOP,
+                                              cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT]])
+    component = (labels[y:y + h, x:x + w] == idx).astype(np.uint8) * 255
+    
+    # Large zones don't need pixel-exact tracing; shrink the ROI and scale points back up
+    # (sized from the ROI, so zones smaller than MAX_TRACE_DIM trace at full resolution)
+    scale = min(1.0, MAX_TRACE_DIM / max(w, h))
+    if scale < 1.0:
+        component = cv2.resize(component, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        _, component = cv2.threshold(component, 127, 255, cv2.THRESH_BINARY)
+    
+    # Trace only the component's ROI; Teh-Chin approximation returns an already-simplified polygon
+    contours, _ = cv2.findContours(component, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_TC89_KCOS)
     
     if not contours:
-        print(f"  WARNING: No contours found in {image_path}")
+        print("  WARNING: No contours found in image")
         return None
     
-    # Get the largest contour (should be the main zone shape)
-    largest_contour = max(contours, key=cv2.contourArea)
+    # Get the largest contour (the component's outer boundary)
+    if len(contours) == 1:
+        largest_contour = contours[0]
+    else:
+        areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64, count=len(contours))
+        largest_contour = contours[int(np.argmax(areas))]
+    
+    # Map ROI coordinates back to full-resolution image pixels
+    if scale < 1.0:
+        largest_contour = (largest_contour.astype(np.float32) / scale).astype(np.int32)
+    largest_contour = largest_contour + np.array([x, y], dtype=np.int32)
     
-    # Simplify the contour to reduce point count (Douglas-Peucker algorithm)
-    epsilon = 0.5  # Approximation accuracy (adjust as needed)
-    simplified = cv2.approxPolyDP(largest_contour, epsilon, True)
+    # Only run Douglas-Peucker if the contour is still very dense
+    simplified = largest_contour
+    if len(simplified) > MAX_CONTOUR_POINTS:
+        epsilon = 0.5  # Approximation accuracy (adjust as needed)
+        simplified = cv2.approxPolyDP(simplified, epsilon, True)
     
     # Convert to list of [x, y] coordinates
-    perimeter = [[int(point[0][0]), int(point[0][1])] for point in simplified]
+    perimeter = simplified.reshape(-1, 2).tolist()
     
     # Ensure the perimeter is closed (first point == last point)
     if len(perimeter) > 0 and perimeter[0] != perimeter[-1]:
@@ -76,100 +134,140 @@ def detect_perimeter_opencv(image_path):
     
     return perimeter
 
-def detect_perimeter_pil(image_path):
+def order_nearest_neighbor(points, max_jump=50, min_segment=10):
+    """
+    Order points into a path by repeatedly stepping to the nearest unvisited point.
+    
+    When the nearest point is further than max_jump (and the path already has
+    more than min_segment points), a new segment starts at the first unvisited point.
+    Uses a KD-tree when scipy is available, otherwise a vectorized NumPy scan.
+    
+    Returns:
+        List of [x, y] points in path order
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    n = len(pts)
+    visited = np.zeros(n, dtype=bool)
+    tree = cKDTree(pts) if HAS_SCIPY else None
+    
+    order = [0]
+    visited[0] = True
+    first_unvisited = 1
+    current = 0
+    
+    while len(order) < n:
+        if tree is not None:
+            # Widen the query until it reaches an unvisited point
+            k = 8
+            while True:
+                dists, idxs = tree.query(pts[current], k=min(k, n))
+                unvisited = ~visited[idxs]
+                if unvisited.any() or k >= n:
+                    break
+                k *= 2
+            hit = int(np.argmax(unvisited))
+            nearest_idx, nearest_dist = int(idxs[hit]), dists[hit]
+        else:
+            dists = np.hypot(*(pts - pts[current]).T)
+            dists[visited] = np.inf
+            nearest_idx = int(np.argmin(dists))
+            nearest_dist = dists[nearest_idx]
+        
+        # If nearest is too far, start new segment
+        if nearest_dist > max_jump and len(order) > min_segment:
+            while visited[first_unvisited]:
+                first_unvisited += 1
+            nearest_idx = first_unvisited
+        
+        visited[nearest_idx] = True
+        order.append(nearest_idx)
+        current = nearest_idx
+    
+    return np.asarray(points)[order].tolist()
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _edge_pixels(mask):
+        """
+        Compiled edge scan: colored pixels with at least one transparent (or
+        out-of-image) 4-connected neighbor, returned as an (N, 2) array of [x, y]
+        in row-major order.
+        """
+        height, width = mask.shape
+        is_edge = np.zeros((height, width), dtype=np.bool_)
+        row_counts = np.zeros(height, dtype=np.int64)
+        
+        for y in prange(height):
+            count = 0
+            for x in range(width):
+                if mask[y, x] and (y == 0 or y == height - 1 or x == 0 or x == width - 1 or
+                                   not mask[y - 1, x] or not mask[y + 1, x] or
+                                   not mask[y, x - 1] or not mask[y, x + 1]):
+                    is_edge[y, x] = True
+                    count += 1
+            row_counts[y] = count
+        
+        # Row offsets keep the output in the same order as np.nonzero
+        offsets = np.zeros(height + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(row_counts)
+        out = np.empty((offsets[height], 2), dtype=np.int32)
+        
+        for y in prange(height):
+            i = offsets[y]
+            for x in range(width):
+                if is_edge[y, x]:
+                    out[i, 0] = x
+                    out[i, 1] = y
+                    i += 1
+        return out
+    
+    # Pay the JIT compilation cost once at import time
+    _edge_pixels(np.ones((4, 4), dtype=np.bool_))
+else:
+    def _edge_pixels(mask):
+        """
+        Edge scan: colored pixels with at least one transparent (or out-of-image)
+        4-connected neighbor, returned as an (N, 2) array of [x, y] in row-major order.
+        """
+        padded = np.pad(mask, 1)
+        interior = (padded[1:-1, 1:-1] & padded[:-2, 1:-1] & padded[2:, 1:-1] &
+                    padded[1:-1, :-2] & padded[1:-1, 2:])
+        ys, xs = np.nonzero(mask & ~interior)
+        return np.stack([xs, ys], axis=1)
+
+def detect_perimeter_pil(pixels):
     """
     Detect perimeter using PIL and numpy (fallback method if OpenCV is not available).
     
+    Args:
+        pixels: RGBA image array of shape (height, width, 4)
+    
     Returns:
         List of [x, y] pixel coordinates representing the perimeter contour
     """
     try:
-        img = Image.open(image_path)
-        
-        # Convert to RGBA if needed
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        width, height = img.size
-        pixels = np.array(img)
-        
-        # Create binary mask: 1 for colored pixels (alpha >= 10), 0 for transparent
+        # Create binary mask: True for colored pixels (alpha >= 10), False for transparent
         alpha = pixels[:, :, 3]
-        mask = (alpha >= 10).astype(np.uint8)
-        
-        # Find edge pixels (colored pixels with at least one transparent neighbor)
-        edge_pixels = []
+        mask = alpha >= 10
         
-        for y in range(height):
-            for x in range(width):
-                if mask[y, x] == 0:
-                    continue  # Skip transparent pixels
-                
-                # Check if it's on image edge
-                if x == 0 or x == width - 1 or y == 0 or y == height - 1:
-                    edge_pixels.append([x, y])
-                    continue
-                
-                # Check 4-connected neighbors (up, right, down, left)
-                neighbors = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-                is_edge = False
-                for dx, dy in neighbors:
-                    nx, ny = x + dx, y + dy
-                    if nx < 0 or nx >= width or ny < 0 or ny >= height:
-                        is_edge = True
-                        break
-                    if mask[ny, nx] == 0:
-                        is_edge = True
-                        break
-                
-                if is_edge:
-                    edge_pixels.append([x, y])
+        # Find edge pixels (colored pixels with at least one transparent 4-connected neighbor)
+        edge_pixels = _edge_pixels(mask)
         
-        if not edge_pixels:
-            print(f"  WARNING: No edge pixels found in {image_path}")
+        if len(edge_pixels) == 0:
+            print("  WARNING: No edge pixels found in image")
             return None
         
-        # Simplify: keep only points that are far enough apart
-        simplified = []
-        threshold = 2  # Minimum distance between points
-        
-        for point in edge_pixels:
-            too_close = False
-            for existing in simplified:
-                dist = np.sqrt((point[0] - existing[0])**2 + (point[1] - existing[1])**2)
-                if dist < threshold:
-                    too_close = True
-                    break
-            if not too_close:
-                simplified.append(point)
+        # Simplify: keep the first point in each threshold x threshold grid cell
+        threshold = 2  # Grid cell size in pixels
+        keys = edge_pixels // threshold
+        _, first_idx = np.unique(keys, axis=0, return_index=True)
+        simplified = edge_pixels[np.sort(first_idx)].tolist()
         
         # Sort points to create a connected path (nearest neighbor)
         if len(simplified) == 0:
             return None
         
-        path = []
-        remaining = simplified.copy()
-        current = remaining.pop(0)
-        path.append(current)
-        
-        while remaining:
-            # Find nearest neighbor
-            nearest_idx = 0
-            nearest_dist = float('inf')
-            
-            for i, point in enumerate(remaining):
-                dist = np.sqrt((current[0] - point[0])**2 + (current[1] - point[1])**2)
-                if dist < nearest_dist:
-                    nearest_dist = dist
-                    nearest_idx = i
-            
-            # If nearest is too far, start new segment
-            if nearest_dist > 50 and len(path) > 10:
-                current = remaining.pop(0)
-                path.append(current)
-            else:
-                current = remaining.pop(nearest_idx)
-                path.append(current)
+        path = order_nearest_neighbor(simplified)
         
         # Ensure the perimeter is closed
         if len(path) > 0 and path[0] != path[-1]:
@@ -183,7 +281,7 @@ def detect_perimeter_pil(image_path):
         print(f"  ERROR in PIL detection: {e}")
         return None
 
-def pixels_to_latlng(pixels, image_width, image_height, bounds):
+def pixels_to_latlng(pixels, image_width, image_height, bounds, soa=False):
     """
     Convert pixel coordinates to lat/lng coordinates.
     
@@ -192,30 +290,133 @@ def pixels_to_latlng(pixels, image_width, image_height, bounds):
         image_width: Width of the image in pixels
         image_height: Height of the image in pixels
         bounds: [[south, west], [north, east]]
+        soa: Return {"lat": [...], "lng": [...]} instead of [[lat, lng], ...]
     
     Returns:
-        List of [lat, lng] coordinates
+        List of [lat, lng] coordinates, or a dict of lat/lng lists if soa is set
     """
     [[south, west], [north, east]] = bounds
     lat_range = north - south
     lng_range = east - west
     
-    latlngs = []
-    for x, y in pixels:
-        # Normalize pixel coordinates (0-1)
-        norm_x = x / image_width
-        norm_y = y / image_height
-        
-        # Convert to lat/lng (Y is flipped: image y=0 is top/north)
-        lng = west + (lng_range * norm_x)
-        lat = north - (lat_range * norm_y)  # Y axis is flipped
-        
-        latlngs.append([lat, lng])
+    pts = np.asarray(pixels, dtype=np.float64)
+    
+    # Convert to lat/lng in one pass (Y is flipped: image y=0 is top/north)
+    lngs = west + (lng_range / image_width) * pts[:, 0]
+    lats = north - (lat_range / image_height) * pts[:, 1]
     
-    return latlngs
+    if soa:
+        return {"lat": lats.tolist(), "lng": lngs.tolist()}
+    
+    return np.stack([lats, lngs], axis=1).tolist()
 
-def process_zones():
-    """Process all zones in flood_zones.json and add perimeter data"""
+def dump_zones_json(zones):
+    """
+    Serialize zones to JSON bytes with one field per line, keeping each value
+    (notably the long perimeter coordinate arrays) compact on a single line.
+    
+    Uses orjson when available.
+    """
+    if HAS_ORJSON:
+        dumps = orjson.dumps
+    else:
+        dumps = lambda value: json.dumps(value, separators=(',', ':')).encode()
+    
+    zone_chunks = []
+    for zone in zones:
+        fields = [b'    ' + dumps(key) + b': ' + dumps(value) for key, value in zone.items()]
+        zone_chunks.append(b'  {\n' + b',\n'.join(fields) + b'\n  }')
+    
+    return b'[\n' + b',\n'.join(zone_chunks) + b'\n]\n'
+
+def process_zone(zone, mapzone_files, soa=False):
+    """
+    Detect the perimeter of one zone image and store it on the zone as lat/lng points.
+    
+    Args:
+        zone: Zone dict from flood_zones.json
+        mapzone_files: Map of image file name -> full path for files in mapzone/
+        soa: Store the perimeter as {"lat": [...], "lng": [...]} instead of point pairs
+    
+    Returns:
+        The zone dict (updated in place)
+    """
+    zone_name = zone.get('name', 'unknown')
+    image_path = zone.get('image_path', '')
+    bounds = zone.get('bounds')
+    
+    print(f"Processing {zone_name} zone...")
+    
+    if not image_path:
+        print(f"  ERROR: No image_path for {zone_name} zone")
+        return zone
+    
+    if not bounds:
+        print(f"  ERROR: No bounds for {zone_name} zone")
+        return zone
+    
+    # Resolve the image from the pre-scanned mapzone directory listing
+    full_image_path = mapzone_files.get(os.path.basename(image_path))
+    
+    if full_image_path is None:
+        print(f"  ERROR: Image not found in mapzone/: {image_path}")
+        return zone
+    
+    print(f"  Image: {full_image_path}")
+    
+    # Decode the image once; its shape also gives the dimensions
+    try:
+        if HAS_OPENCV:
+            img = cv2.imread(full_image_path, cv2.IMREAD_UNCHANGED)
+            if img is None:
+                raise ValueError("unsupported or corrupt image file")
+        else:
+            img = np.asarray(Image.open(full_image_path).convert('RGBA'))
+        img_height, img_width = img.shape[:2]
+        print(f"  Image size: {img_width}x{img_height}")
+    except Exception as e:
+        print(f"  ERROR: Could not load image: {e}")
+        return zone
+    
+    # Detect perimeter
+    if HAS_OPENCV:
+        perimeter_pixels = detect_perimeter_opencv(img)
+    else:
+        perimeter_pixels = detect_perimeter_pil(img)
+    
+    if not perimeter_pixels:
+        print(f"  WARNING: Could not detect perimeter for {zone_name} zone")
+        return zone
+    
+    # Convert pixel coordinates to lat/lng
+    perimeter_latlng = pixels_to_latlng(perimeter_pixels, img_width, img_height, bounds, soa=soa)
+    
+    print(f"  Converted to {len(perimeter_pixels)} lat/lng points")
+    
+    # Save perimeter to zone data
+    zone['perimeter'] = perimeter_latlng
+    
+    # Also save pixel coordinates for reference (optional)
+    zone['perimeter_pixels'] = perimeter_pixels
+    
+    print(f"  ✓ Perimeter saved for {zone_name} zone\n")
+    
+    return zone
+
+def _process_one(zone, mapzone_files, soa=False):
+    """Worker entry point: process one zone and capture its log output"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        zone = process_zone(zone, mapzone_files, soa=soa)
+    return zone, output.getvalue()
+
+def process_zones(soa=False):
+    """
+    Process all zones in flood_zones.json and add perimeter data
+    
+    Args:
+        soa: Store perimeters as {"lat": [...], "lng": [...]} instead of [[lat, lng], ...]
+    """
     
     # Paths
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -225,80 +426,44 @@ def process_zones():
     
     # Load zones
     print(f"Loading zones from {json_path}...")
-    with open(json_path, 'r') as f:
-        zones = json.load(f)
+    with open(json_path, 'rb') as f:
+        raw = f.read()
+    zones = json.loads(raw)
+    
+    # Digest of the file as loaded, so an unchanged result can skip the rewrite
+    original_digest = hashlib.blake2b(raw).digest()
     
     print(f"Found {len(zones)} zones to process\n")
     
-    # Process each zone
-    for zone in zones:
-        zone_name = zone.get('name', 'unknown')
-        image_path = zone.get('image_path', '')
-        bounds = zone.get('bounds')
-        
-        print(f"Processing {zone_name} zone...")
-        
-        if not image_path:
-            print(f"  ERROR: No image_path for {zone_name} zone")
-            continue
-        
-        if not bounds:
-            print(f"  ERROR: No bounds for {zone_name} zone")
-            continue
-        
-        # Convert image_path to full path
-        # Remove leading slash if present
-        if image_path.startswith('/'):
-            image_path = image_path[1:]
-        
-        full_image_path = os.path.join(project_root, image_path)
-        
-        if not os.path.exists(full_image_path):
-            print(f"  ERROR: Image not found at {full_image_path}")
-            continue
-        
-        print(f"  Image: {full_image_path}")
-        
-        # Get image dimensions
-        try:
-            img = Image.open(full_image_path)
-            img_width, img_height = img.size
-            print(f"  Image size: {img_width}x{img_height}")
-        except Exception as e:
-            print(f"  ERROR: Could not read image dimensions: {e}")
-            continue
-        
-        # Detect perimeter
-        if HAS_OPENCV:
-            perimeter_pixels = detect_perimeter_opencv(full_image_path)
-        else:
-            perimeter_pixels = detect_perimeter_pil(full_image_path)
-        
-        if not perimeter_pixels:
-            print(f"  WARNING: Could not detect perimeter for {zone_name} zone")
-            continue
-        
-        # Convert pixel coordinates to lat/lng
-        perimeter_latlng = pixels_to_latlng(perimeter_pixels, img_width, img_height, bounds)
-        
-        print(f"  Converted to {len(perimeter_latlng)} lat/lng points")
-        
-        # Save perimeter to zone data
-        zone['perimeter'] = perimeter_latlng
-        
-        # Also save pixel coordinates for reference (optional)
-        zone['perimeter_pixels'] = perimeter_pixels
-        
-        print(f"  ✓ Perimeter saved for {zone_name} zone\n")
+    # List mapzone/ once instead of stat-ing each zone image individually
+    mapzone_files = {}
+    if os.path.isdir(mapzone_dir):
+        mapzone_files = {e.name: e.path for e in os.scandir(mapzone_dir) if e.is_file()}
     
-    # Save updated zones
-    print(f"Saving updated zones to {json_path}...")
-    with open(json_path, 'w') as f:
-        json.dump(zones, f, indent=2)
+    # Process zones in parallel; each one is an independent image decode + detection
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(partial(_process_one, mapzone_files=mapzone_files, soa=soa), zones))
+    
+    zones = []
+    for zone, output in results:
+        print(output, end='')
+        zones.append(zone)
+    
+    # Save updated zones, only if they changed; write to a temp file and swap atomically
+    new_bytes = dump_zones_json(zones)
+    if hashlib.blake2b(new_bytes).digest() == original_digest:
+        print(f"No changes; leaving {json_path} untouched.")
+    else:
+        print(f"Saving updated zones to {json_path}...")
+        tmp_path = json_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(new_bytes)
+        os.replace(tmp_path, json_path)
     
     print("Done! Perimeters have been added to all zones.")
     print("\nYou can now use these pre-computed perimeters in your JavaScript code.")
 
 if __name__ == '__main__':
-    process_zones()
+    # --soa stores perimeters as parallel lat/lng arrays (smaller and faster to parse)
+    process_zones(soa='--soa' in sys.argv[1:])
 
@@ -5,8 +5,25 @@ Fix flood zone bounds to match image aspect ratios
 
 import json
 import os
+import struct
 from PIL import Image
 
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def _png_size(path):
+    """
+    Read (width, height) straight from a PNG's IHDR header without decoding it.
+    Falls back to PIL for files that are not PNGs.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    
+    if header[:8] == PNG_SIGNATURE and header[12:16] == b'IHDR':
+        return struct.unpack('>II', header[16:24])
+    
+    with Image.open(path) as img:
+        return img.size
+
 def fix_zone_bounds():
     """Fix all zone bounds to match their image aspect ratios"""
     
@@ -55,8 +72,7 @@ def fix_zone_bounds():
         
         # Get image dimensions
         try:
-            img = Image.open(full_image_path)
-            width, height = img.size
+            width, height = _png_size(full_image_path)
             aspect_ratio = width / height
             
             print(f"  Image: {image_path}")
@@ -3,18 +3,34 @@
 Process flood zone images to detect colored pixel bounds and update flood_zones.json
 This script analyzes each zone image and adjusts the bounds to only cover colored pixels,
 excluding transparent borders.
+
+Requirements:
+    pip install numpy pillow
+    pip install opencv-python  # optional, faster bounds detection
 """
 
+import hashlib
+import io
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+import numpy as np
 from PIL import Image
 
+try:
+    import cv2
+    HAS_OPENCV = True
+except ImportError:
+    HAS_OPENCV = False
+
 def detect_content_bounds(image_path):
     """
     Detect the bounding box of non-transparent pixels in an image.
     
     Returns:
-        dict with normalized bounds (0-1): {minX, minY, maxX, maxY}
+        Tuple of normalized bounds (0-1): (min_x, min_y, max_x, max_y)
         or None if detection fails
     """
     try:
@@ -25,53 +41,30 @@ def detect_content_bounds(image_path):
             img = img.convert('RGBA')
         
         width, height = img.size
-        pixels = img.load()
-        
-        # Find bounding box of non-transparent pixels
-        min_x = width
-        min_y = height
-        max_x = 0
-        max_y = 0
-        found_colored = False
         
-        # Scan all pixels to find the bounding box
-        for y in range(height):
-            for x in range(width):
-                r, g, b, a = pixels[x, y]
-                
-                # Check if pixel is not transparent (alpha >= 10)
-                if a >= 10:
-                    found_colored = True
-                    if x < min_x:
-                        min_x = x
-                    if x > max_x:
-                        max_x = x
-                    if y < min_y:
-                        min_y = y
-                    if y > max_y:
-                        max_y = y
+        # Mask of non-transparent pixels (alpha >= 10)
+        mask = np.asarray(img)[:, :, 3] >= 10
         
-        if not found_colored:
+        if not mask.any():
             print(f"  WARNING: No colored pixels found in {image_path}")
             return None
         
-        # Normalize to 0-1 range
-        bounds = {
-            'minX': min_x / width,
-            'minY': min_y / height,
-            'maxX': (max_x + 1) / width,  # +1 to include the pixel
-            'maxY': (max_y + 1) / height,  # +1 to include the pixel
-            'pixelBounds': {
-                'minX': min_x,
-                'minY': min_y,
-                'maxX': max_x,
-                'maxY': max_y
-            },
-            'imageSize': {'width': width, 'height': height}
-        }
+        if HAS_OPENCV:
+            # Single optimized scan for the bounding box of nonzero pixels
+            x, y, w, h = cv2.boundingRect(mask.view(np.uint8))
+            min_x, min_y, max_x, max_y = x, y, x + w - 1, y + h - 1
+        else:
+            # Bounding box from the rows/columns that contain any colored pixel
+            ys = np.where(mask.any(axis=1))[0]
+            xs = np.where(mask.any(axis=0))[0]
+            min_y, max_y = int(ys[0]), int(ys[-1])
+            min_x, max_x = int(xs[0]), int(xs[-1])
         
-        content_width = bounds['maxX'] - bounds['minX']
-        content_height = bounds['maxY'] - bounds['minY']
+        # Normalize to 0-1 range (+1 on the max edges to include the last pixel)
+        bounds = (min_x / width, min_y / height, (max_x + 1) / width, (max_y + 1) / height)
+        
+        content_width = bounds[2] - bounds[0]
+        content_height = bounds[3] - bounds[1]
         
         print(f"  Content bounds: {content_width*100:.2f}% width, {content_height*100:.2f}% height")
         
@@ -86,27 +79,90 @@ def adjust_bounds_to_content(content_bounds, original_bounds):
     Adjust geographic bounds to only cover the colored pixel area.
     
     Args:
-        content_bounds: dict with normalized bounds {minX, minY, maxX, maxY}
+        content_bounds: Normalized bounds tuple (min_x, min_y, max_x, max_y)
         original_bounds: [[south, west], [north, east]]
     
     Returns:
         [[south, west], [north, east]] - adjusted bounds
     """
     [[south, west], [north, east]] = original_bounds
+    nx0, ny0, nx1, ny1 = content_bounds
     lat_range = north - south
     lng_range = east - west
     
     # Calculate new bounds that map ONLY the colored pixel area to geography
     # For longitude (X axis):
-    new_west = west + (lng_range * content_bounds['minX'])
-    new_east = west + (lng_range * content_bounds['maxX'])
+    new_west = west + (lng_range * nx0)
+    new_east = west + (lng_range * nx1)
     
     # For latitude (Y axis is flipped - image y=0 is top/north):
-    new_north = north - (lat_range * content_bounds['minY'])
-    new_south = north - (lat_range * content_bounds['maxY'])
+    new_north = north - (lat_range * ny0)
+    new_south = north - (lat_range * ny1)
     
     return [[new_south, new_west], [new_north, new_east]]
 
+def process_zone(zone, mapzone_files):
+    """
+    Detect the colored-pixel bounds of one zone image and adjust the zone bounds to match.
+    
+    Args:
+        zone: Zone dict from flood_zones.json
+        mapzone_files: Map of image file name -> full path for files in mapzone/
+    
+    Returns:
+        The zone dict (updated in place)
+    """
+    zone_name = zone.get('name', 'unknown')
+    image_path = zone.get('image_path', '')
+    original_bounds = zone.get('bounds')
+    
+    print(f"Processing {zone_name} zone...")
+    
+    if not image_path:
+        print(f"  ERROR: No image_path for {zone_name} zone")
+        return zone
+    
+    if not original_bounds:
+        print(f"  ERROR: No bounds for {zone_name} zone")
+        return zone
+    
+    # Resolve the image from the pre-scanned mapzone directory listing
+    full_image_path = mapzone_files.get(os.path.basename(image_path))
+    
+    if full_image_path is None:
+        print(f"  ERROR: Image not found in mapzone/: {image_path}")
+        return zone
+    
+    print(f"  Image: {full_image_path}")
+    print(f"  Original bounds: {original_bounds}")
+    
+    # Detect content bounds
+    content_bounds = detect_content_bounds(full_image_path)
+    
+    if content_bounds:
+        # Calculate adjusted bounds
+        adjusted_bounds = adjust_bounds_to_content(content_bounds, original_bounds)
+        
+        print(f"  Adjusted bounds: {adjusted_bounds}")
+        
+        # Update zone
+        zone['bounds'] = adjusted_bounds
+        
+        # Store original bounds as backup (optional)
+        if 'original_bounds' not in zone:
+            zone['original_bounds'] = original_bounds
+    
+    print()
+    
+    return zone
+
+def _process_one(zone, mapzone_files):
+    """Worker entry point: process one zone and capture its log output"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        zone = process_zone(zone, mapzone_files)
+    return zone, output.getvalue()
+
 def process_zones():
     """Process all zones in flood_zones.json and update bounds"""
     
@@ -118,63 +174,39 @@ def process_zones():
     
     # Load zones
     print(f"Loading zones from {json_path}...")
-    with open(json_path, 'r') as f:
-        zones = json.load(f)
+    with open(json_path, 'rb') as f:
+        raw = f.read()
+    zones = json.loads(raw)
+    
+    # Digest of the file as loaded, so an unchanged result can skip the rewrite
+    original_digest = hashlib.blake2b(raw).digest()
     
     print(f"Found {len(zones)} zones to process\n")
     
-    # Process each zone
-    for zone in zones:
-        zone_name = zone.get('name', 'unknown')
-        image_path = zone.get('image_path', '')
-        original_bounds = zone.get('bounds')
-        
-        print(f"Processing {zone_name} zone...")
-        
-        if not image_path:
-            print(f"  ERROR: No image_path for {zone_name} zone")
-            continue
-        
-        if not original_bounds:
-            print(f"  ERROR: No bounds for {zone_name} zone")
-            continue
-        
-        # Convert image_path to full path
-        # Remove leading slash if present
-        if image_path.startswith('/'):
-            image_path = image_path[1:]
-        
-        full_image_path = os.path.join(project_root, image_path)
-        
-        if not os.path.exists(full_image_path):
-            print(f"  ERROR: Image not found at {full_image_path}")
-            continue
-        
-        print(f"  Image: {full_image_path}")
-        print(f"  Original bounds: {original_bounds}")
-        
-        # Detect content bounds
-        content_bounds = detect_content_bounds(full_image_path)
-        
-        if content_bounds:
-            # Calculate adjusted bounds
-            adjusted_bounds = adjust_bounds_to_content(content_bounds, original_bounds)
-            
-            print(f"  Adjusted bounds: {adjusted_bounds}")
-            
-            # Update zone
-            zone['bounds'] = adjusted_bounds
-            
-            # Store original bounds as backup (optional)
-            if 'original_bounds' not in zone:
-                zone['original_bounds'] = original_bounds
-        
-        print()
+    # List mapzone/ once instead of stat-ing each zone image individually
+    mapzone_files = {}
+    if os.path.isdir(mapzone_dir):
+        mapzone_files = {e.name: e.path for e in os.scandir(mapzone_dir) if e.is_file()}
+    
+    # Process zones in parallel; each one is an independent image decode + detection
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(partial(_process_one, mapzone_files=mapzone_files), zones))
+    
+    zones = []
+    for zone, output in results:
+        print(output, end='')
+        zones.append(zone)
     
-    # Save updated zones
-    print(f"Saving updated zones to {json_path}...")
-    with open(json_path, 'w') as f:
-        json.dump(zones, f, indent=2)
+    # Save updated zones, only if they changed; write to a temp file and swap atomically
+    new_bytes = json.dumps(zones, indent=2).encode()
+    if hashlib.blake2b(new_bytes).digest() == original_digest:
+        print(f"No changes; leaving {json_path} untouched.")
+    else:
+        print(f"Saving updated zones to {json_path}...")
+        tmp_path = json_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(new_bytes)
+        os.replace(tmp_path, json_path)
     
     print("Done! Bounds have been updated to only cover colored pixels.")
 
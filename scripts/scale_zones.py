@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """
 Scale flood zones up or down while maintaining their aspect ratio and center point
+
+Requirements:
+    pip install numpy
 """
 
 import json
 import os
 import sys
+import numpy as np
 
 def scale_zones(scale_factor=1.0):
     """
@@ -29,51 +33,41 @@ def scale_zones(scale_factor=1.0):
     print(f"Scale factor: {scale_factor}x ({scale_factor * 100:.0f}% of original size)")
     print("=" * 70)
     
-    updated_count = 0
-    
-    # Scale each zone
+    # Collect zones with usable bounds
+    valid_zones = []
     for zone in zones:
-        zone_id = zone.get('id')
-        zone_name = zone.get('name', 'unknown')
         bounds = zone.get('bounds', [])
         
         if not bounds or len(bounds) != 2:
-            print(f"Zone {zone_id} ({zone_name}): Invalid bounds, skipping")
+            print(f"Zone {zone.get('id')} ({zone.get('name', 'unknown')}): Invalid bounds, skipping")
             continue
         
-        # Get current bounds
-        [[south, west], [north, east]] = bounds
-        
-        # Calculate center point
-        center_lat = (south + north) / 2
-        center_lng = (west + east) / 2
-        
-        # Calculate current size
-        lat_range = north - south
-        lng_range = east - west
-        
-        # Calculate new size (scale both dimensions by the same factor)
-        new_lat_range = lat_range * scale_factor
-        new_lng_range = lng_range * scale_factor
-        
-        # Calculate new bounds centered on the same center point
-        new_south = center_lat - new_lat_range / 2
-        new_north = center_lat + new_lat_range / 2
-        new_west = center_lng - new_lng_range / 2
-        new_east = center_lng + new_lng_range / 2
-        
-        new_bounds = [[new_south, new_west], [new_north, new_east]]
-        
-        print(f"\nZone {zone_id} ({zone_name}):")
-        print(f"  Center: [{center_lat:.6f}, {center_lng:.6f}]")
-        print(f"  Old size: Lat {lat_range:.6f}°, Lng {lng_range:.6f}°")
-        print(f"  New size: Lat {new_lat_range:.6f}°, Lng {new_lng_range:.6f}°")
-        print(f"  Old bounds: [[{south:.6f}, {west:.6f}], [{north:.6f}, {east:.6f}]]")
-        print(f"  New bounds: [[{new_south:.6f}, {new_west:.6f}], [{new_north:.6f}, {new_east:.6f}]]")
+        valid_zones.append(zone)
+    
+    updated_count = len(valid_zones)
+    
+    if valid_zones:
+        # Scale all zones at once: (N, 2, 2) array of [[south, west], [north, east]]
+        old_bounds = np.array([zone['bounds'] for zone in valid_zones], dtype=np.float64)
+        centers = old_bounds.mean(axis=1)              # (N, 2) of [lat, lng]
+        sizes = old_bounds[:, 1] - old_bounds[:, 0]    # (N, 2) of [lat_range, lng_range]
+        new_sizes = sizes * scale_factor
+        new_bounds = np.stack([centers - new_sizes / 2, centers + new_sizes / 2], axis=1)
         
-        # Update zone bounds
-        zone['bounds'] = new_bounds
-        updated_count += 1
+        for zone, center, size, new_size, old, new in zip(
+                valid_zones, centers, sizes, new_sizes, old_bounds, new_bounds):
+            [[south, west], [north, east]] = old
+            [[new_south, new_west], [new_north, new_east]] = new
+            
+            print(f"\nZone {zone.get('id')} ({zone.get('name', 'unknown')}):")
+            print(f"  Center: [{center[0]:.6f}, {center[1]:.6f}]")
+            print(f"  Old size: Lat {size[0]:.6f}°, Lng {size[1]:.6f}°")
+            print(f"  New size: Lat {new_size[0]:.6f}°, Lng {new_size[1]:.6f}°")
+            print(f"  Old bounds: [[{south:.6f}, {west:.6f}], [{north:.6f}, {east:.6f}]]")
+            print(f"  New bounds: [[{new_south:.6f}, {new_west:.6f}], [{new_north:.6f}, {new_east:.6f}]]")
+            
+            # Update zone bounds
+            zone['bounds'] = new.tolist()
     
     # Save updated zones
     if updated_count > 0:
@@ -3,13 +3,78 @@ Admin Log Service
 Tracks all user-chatbot interactions with IP addresses for admin purposes
 """
 
+import atexit
+import functools
 import json
+import mmap
 import os
-from datetime import datetime
-from typing import Dict, Any, Optional, List
-from collections import defaultdict
+import queue
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from itertools import islice
 from pathlib import Path
 
+from services.time_utils import now_iso
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    LEGACY_PARSE_ERRORS = (ijson.JSONError,)
+except ImportError:
+    IJSON_AVAILABLE = False
+    LEGACY_PARSE_ERRORS = ()
+
+# Most recent interactions kept in memory per IP (older ones remain in the JSONL file)
+MAX_INTERACTIONS_PER_IP = 1000
+
+# Queued records are written by a background thread every FLUSH_INTERVAL seconds,
+# or sooner once FLUSH_BATCH_SIZE records are waiting
+FLUSH_INTERVAL = 0.5
+FLUSH_BATCH_SIZE = 256
+
+# Seconds between snapshots of the log to <log file>.backup
+BACKUP_INTERVAL = 3600
+
+# Legacy admin_log.json files larger than this are migrated with a streaming parser
+LEGACY_STREAM_THRESHOLD = 100 * 1024 * 1024
+
+# The FTS5 trigram tokenizer only matches queries of at least this many characters
+FTS_MIN_QUERY_LENGTH = 3
+
+# Metadata values of these types are stored as-is
+_JSON_PRIMITIVES = (str, int, float, bool, type(None))
+
+def _cap(value: Any, limit: int = 10000) -> str:
+    """Convert value to str and truncate it to limit characters, copying only when needed"""
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= limit else text[:limit]
+
+def _record_timestamp(record: Dict[str, Any]) -> str:
+    """Sort key for interaction records (ISO timestamps order correctly as strings)"""
+    return record.get('timestamp', '')
+
+def _dumps(obj: Any) -> bytes:
+    """Encode obj as compact UTF-8 JSON bytes (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _loads(data: bytes) -> Any:
+    """Decode JSON bytes (orjson when available)"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
 class AdminLogService:
     """Service for logging all user-chatbot interactions with IP addresses"""
     
@@ -27,7 +92,6 @@ class AdminLogService:
             self.logs_dir = Path('logs')
         
         self._in_memory = False
-        self._memory_storage = {}  # Fallback in-memory storage
         try:
             self.logs_dir.mkdir(parents=True, exist_ok=True)
         except (IOError, PermissionError, OSError) as e:
@@ -52,11 +116,40 @@ class AdminLogService:
                         print(f"Could not move existing log file: {e}")
                 log_file = self.logs_dir / log_file.name
         
-        self.log_file = str(log_file)
+        # Interactions are appended one JSON object per line to <log_file>l (admin_log.jsonl);
+        # the old whole-file admin_log.json is only read once to migrate it
+        self.legacy_log_file = str(log_file)
+        self.log_file = self.legacy_log_file + 'l'
+        self._log_fd = None  # O_APPEND descriptor, opened once and reused for every batch
+        self._lock = threading.Lock()  # Guards the index
+        self._write_lock = threading.Lock()  # Serializes draining the queue into the file
+        self._queue = queue.SimpleQueue()  # Records waiting to be written
+        self._wake = threading.Event()
+        
+        # Optional SQLite/FTS5 copy of the log used by search_interactions
+        self.search_db_file = str(Path(self.legacy_log_file).with_suffix('.db'))
+        self._db = None
+        self._db_lock = threading.Lock()
+        
+        # Per-IP summary kept in memory: {ip: {first_seen, last_seen, total_interactions,
+        # type_counts, interactions}} where interactions holds the most recent MAX_INTERACTIONS_PER_IP records.
+        # With a log file, the index is fed only from the file, tailed from _index_offset, so
+        # records written by other instances and processes show up too
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._index_offset = 0
+        
         self._ensure_log_file()
+        self._build_index()
+        if self._log_fd is not None:
+            self._open_search_db()
+        
+        # Disk writes happen off the request path in a daemon thread
+        if self._log_fd is not None:
+            threading.Thread(target=self._flush_loop, name='admin-log-flush', daemon=True).start()
+            atexit.register(self._flush_and_close)
     
     def _ensure_log_file(self):
-        """Create the admin log file if it doesn't exist"""
+        """Create the admin log file if it doesn't exist and open it for appending"""
         # Ensure logs directory exists
         try:
             self.logs_dir.mkdir(parents=True, exist_ok=True)
@@ -67,80 +160,424 @@ class AdminLogService:
         
         # Check if there's an old admin_log.json in the root directory and move it
         old_log_path = Path('admin_log.json')
-        new_log_path = Path(self.log_file)
+        new_log_path = Path(self.legacy_log_file)
         if old_log_path.exists() and old_log_path.is_file() and not new_log_path.exists():
             try:
-                # Load old log data
-                with open(old_log_path, 'r', encoding='utf-8') as f:
-                    old_data = json.load(f)
-                # Save to new location
-                with open(new_log_path, 'w', encoding='utf-8') as f:
-                    json.dump(old_data, f, indent=2, ensure_ascii=False)
+                old_log_path.rename(new_log_path)
                 print(f"Moved existing admin_log.json from root to {new_log_path}")
-                # Optionally remove old file
-                try:
-                    old_log_path.unlink()
-                except Exception:
-                    pass
             except Exception as e:
                 print(f"Could not migrate old log file: {e}")
         
         try:
-            if not os.path.exists(self.log_file):
-                with open(self.log_file, 'w', encoding='utf-8') as f:
-                    json.dump({}, f)
+            if not os.path.exists(self.log_file) and new_log_path.exists():
+                self._migrate_legacy_log(new_log_path)
+            
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+            self._log_fd = os.open(self.log_file, flags, 0o644)
         except (IOError, PermissionError, OSError) as e:
             print(f"Warning: Could not create {self.log_file}: {e}. Using in-memory storage.")
             self._in_memory = True
     
-    def _load_log(self) -> Dict[str, Any]:
-        """Load all admin logs from JSON file"""
-        if self._in_memory:
-            return self._memory_storage
+    def _iter_legacy_log(self, legacy_path: Path) -> Iterator[tuple]:
+        """
+        Yield (ip, entry) pairs from a whole-file admin_log.json.
+        
+        Files above LEGACY_STREAM_THRESHOLD bytes are streamed with ijson (when
+        installed) so only one IP entry is held in memory at a time.
+        """
+        if IJSON_AVAILABLE and os.path.getsize(legacy_path) > LEGACY_STREAM_THRESHOLD:
+            with open(legacy_path, 'rb') as f:
+                yield from ijson.kvitems(f, '', use_float=True)
+            return
+        
+        with open(legacy_path, 'rb') as f:
+            log = _loads(f.read())
+        if isinstance(log, dict):
+            yield from log.items()
+    
+    def _migrate_legacy_log(self, legacy_path: Path):
+        """Convert a whole-file admin_log.json ({ip: {..., interactions: [...]}}) to JSONL"""
+        # Write to a temp file and rename it so an interrupted migration is retried
+        tmp_file = f"{self.log_file}.tmp"
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                log = json.load(f)
-                return log if isinstance(log, dict) else {}
-        except (json.JSONDecodeError, FileNotFoundError, IOError, PermissionError):
-            return {}
+            with open(tmp_file, 'wb') as out:
+                for ip, entry in self._iter_legacy_log(legacy_path):
+                    for interaction in entry.get('interactions', []):
+                        out.write(self._encode_record({**interaction, 'ip_address': ip}))
+        except (json.JSONDecodeError, IOError, ValueError) + LEGACY_PARSE_ERRORS as e:
+            print(f"Could not read legacy log file {legacy_path}: {e}")
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+            return
+        os.replace(tmp_file, self.log_file)
+        
+        print(f"Migrated {legacy_path} to {self.log_file}")
     
-    def _save_log(self, log: Dict[str, Any]):
-        """Save admin log to JSON file"""
+    @staticmethod
+    def _encode_record(record: Dict[str, Any]) -> bytes:
+        """Encode one interaction record as a JSONL line"""
+        return _dumps(record) + b'\n'
+    
+    def _open_mmap(self) -> Optional[mmap.mmap]:
+        """Map the JSONL log read-only; None if it is missing or empty"""
+        self._flush_pending()
+        
+        try:
+            fd = os.open(self.log_file, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            if os.fstat(fd).st_size == 0:
+                return None
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _line_timestamp(line: bytes) -> bytes:
+        """Pull the raw timestamp value out of a JSONL line without parsing it"""
+        key = line.find(b'"timestamp"')
+        if key < 0:
+            return b''
+        start = line.find(b'"', key + 11) + 1
+        return line[start:line.find(b'"', start)]
+    
+    def _iter_records(
+        self,
+        ip_address: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        text: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream logged interaction records (each includes its ip_address).
+        
+        Args:
+            ip_address: Only yield records for this IP address
+            start_date: Only yield records with timestamp >= start_date (ISO format)
+            end_date: Only yield records with timestamp <= end_date (ISO format)
+            text: Skip lines that cannot contain this text (case-insensitive). This is
+                only a prefilter; callers still check which field matched.
+        """
         if self._in_memory:
-            self._memory_storage = log
+            # Without a log file, the per-IP recent interactions are the only storage.
+            # Go straight to the requested IP's entry instead of checking every record.
+            with self._lock:
+                if ip_address:
+                    entry = self._index.get(ip_address)
+                    entries = [entry] if entry is not None else []
+                else:
+                    entries = list(self._index.values())
+                
+                records = []
+                for entry in entries:
+                    interactions = entry['interactions']
+                    # Each IP's interactions are appended in time order, so the date
+                    # range is a contiguous slice found by binary search
+                    lo = bisect_left(interactions, start_date, key=_record_timestamp) if start_date else 0
+                    hi = bisect_right(interactions, end_date, key=_record_timestamp) if end_date else len(interactions)
+                    records.extend(islice(interactions, lo, hi))
+            
+            yield from records
             return
-        try:
-            # Ensure logs directory exists
+        
+        mm = self._open_mmap()
+        if mm is None:
+            return
+        
+        # Byte-level prefilters so only candidate lines are parsed
+        ip_needle = _dumps(ip_address) if ip_address else None
+        start_bytes = start_date.encode('utf-8') if start_date else None
+        end_bytes = end_date.encode('utf-8') if end_date else None
+        
+        # Match the text as it appears JSON-encoded in the line; re.IGNORECASE on bytes
+        # only folds ASCII, so non-ASCII queries skip this prefilter
+        text_pattern = None
+        if text and text.isascii():
+            text_pattern = re.compile(re.escape(_dumps(text)[1:-1]), re.IGNORECASE)
+        
+        with mm:
+            pos = 0
+            size = len(mm)
+            while pos < size:
+                end = mm.find(b'\n', pos)
+                if end < 0:
+                    end = size
+                line = mm[pos:end]
+                pos = end + 1
+                
+                if not line.strip():
+                    continue
+                if ip_needle and ip_needle not in line:
+                    continue
+                if text_pattern and not text_pattern.search(line):
+                    continue
+                if start_bytes or end_bytes:
+                    timestamp = self._line_timestamp(line)
+                    if start_bytes and timestamp < start_bytes:
+                        continue
+                    if end_bytes and timestamp > end_bytes:
+                        continue
+                
+                try:
+                    record = _loads(line)
+                except json.JSONDecodeError:
+                    continue  # Skip a partially written trailing line
+                
+                # The IP needle may also match inside a message; confirm on the parsed record
+                if ip_address and record.get('ip_address') != ip_address:
+                    continue
+                yield record
+    
+    def _update_index(self, record: Dict[str, Any]):
+        """Fold one interaction record into the per-IP summary"""
+        ip = record.get('ip_address', 'unknown')
+        timestamp = record.get('timestamp')
+        entry = self._index.get(ip)
+        if entry is None:
+            entry = self._index[ip] = {
+                'first_seen': timestamp,
+                'last_seen': timestamp,
+                'total_interactions': 0,
+                'type_counts': defaultdict(int),
+                'interactions': deque(maxlen=MAX_INTERACTIONS_PER_IP)
+            }
+        entry['last_seen'] = timestamp
+        entry['total_interactions'] += 1
+        entry['type_counts'][record.get('interaction_type', 'unknown')] += 1
+        entry['interactions'].append(record)  # Oldest entries are evicted automatically
+    
+    def _build_index(self):
+        """Build the per-IP summary with one pass over the log file"""
+        with self._lock:
+            self._index = {}
+            self._index_offset = 0
+        self._refresh_index()
+    
+    def _refresh_index(self):
+        """Fold records appended to the log file since the last refresh (by any process) into the index"""
+        if self._in_memory:
+            return
+        self._flush_pending()
+        
+        with self._lock:
             try:
-                self.logs_dir.mkdir(parents=True, exist_ok=True)
-            except (IOError, PermissionError, OSError) as e:
-                # If we can't create directory, switch to in-memory storage
-                print(f"Warning: Could not create logs directory: {e}. Switching to in-memory storage.")
-                self._in_memory = True
-                self._memory_storage = log
+                with open(self.log_file, 'rb') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    if size < self._index_offset:
+                        # The log was replaced; rebuild the index from scratch
+                        self._index = {}
+                        self._index_offset = 0
+                    if size == self._index_offset:
+                        return
+                    f.seek(self._index_offset)
+                    data = f.read(size - self._index_offset)
+            except (IOError, OSError):
                 return
             
-            # Create backup of existing log before writing
-            if os.path.exists(self.log_file):
-                backup_file = f"{self.log_file}.backup"
+            # Stop at the last complete line; a partially written one is read next time
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
                 try:
-                    with open(self.log_file, 'r', encoding='utf-8') as src, open(backup_file, 'w', encoding='utf-8') as dst:
-                        dst.write(src.read())
-                except Exception:
-                    pass  # If backup fails, continue anyway
+                    record = _loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._update_index(record)
+            self._index_offset += end
+    
+    def _append_record(self, record: Dict[str, Any]):
+        """Queue one interaction for the background writer (or index it directly without a log file)"""
+        if self._in_memory:
+            with self._lock:
+                self._update_index(record)
+            return
+        
+        self._queue.put(record)
+        if self._queue.qsize() >= FLUSH_BATCH_SIZE:
+            self._wake.set()
+    
+    def _flush_pending(self):
+        """Write every queued record to the log file in one batch"""
+        with self._write_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if not batch or self._log_fd is None:
+                return
+            
+            try:
+                data = memoryview(b''.join(self._encode_record(record) for record in batch))
+                while data:
+                    data = data[os.write(self._log_fd, data):]
+                # One fsync per batch rather than per interaction
+                os.fsync(self._log_fd)
+            except (IOError, PermissionError, OSError, ValueError) as e:
+                # In serverless environments, file writes may fail - use in-memory storage
+                # (the per-IP index becomes the only copy of the records)
+                print(f"Warning: Could not write to {self.log_file}: {e}. Using in-memory storage.")
+                self._in_memory = True
+                with self._lock:
+                    for record in batch:
+                        self._update_index(record)
+                return
+            
+            if self._db is not None:
+                self._index_in_db(batch, os.fstat(self._log_fd).st_size)
+    
+    def _open_search_db(self):
+        """Open the SQLite search index and catch it up with the JSONL log"""
+        try:
+            db = sqlite3.connect(self.search_db_file, check_same_thread=False)
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS interactions (
+                    ip TEXT, ts TEXT, type TEXT, session TEXT,
+                    user_msg TEXT, resp TEXT, record TEXT
+                );
+                CREATE INDEX IF NOT EXISTS interactions_ip_ts ON interactions (ip, ts);
+                CREATE INDEX IF NOT EXISTS interactions_ts ON interactions (ts);
+                CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+                    user_msg, resp, content='interactions', tokenize='trigram'
+                );
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+            """)
+        except sqlite3.Error as e:
+            # e.g. SQLite built without FTS5 - search falls back to scanning the JSONL log
+            print(f"Warning: Could not open search index {self.search_db_file}: {e}")
+            return
+        
+        self._db = db
+        
+        # Index whatever was appended to the log since the database was last updated
+        row = db.execute("SELECT value FROM meta WHERE key = 'jsonl_offset'").fetchone()
+        offset = row[0] if row else 0
+        try:
+            with open(self.log_file, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if offset > size:
+                    # The log was replaced; rebuild the index from scratch
+                    with self._db_lock, db:
+                        db.execute("DELETE FROM interactions")
+                        db.execute("INSERT INTO interactions_fts (interactions_fts) VALUES ('delete-all')")
+                    offset = 0
+                f.seek(offset)
+                data = f.read()
+        except (IOError, OSError) as e:
+            print(f"Warning: Could not read {self.log_file} for the search index: {e}")
+            return
+        
+        end = data.rfind(b'\n') + 1
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                records.append(_loads(line))
+            except json.JSONDecodeError:
+                continue
+        self._index_in_db(records, offset + end)
+    
+    def _index_in_db(self, records: List[Dict[str, Any]], offset: int):
+        """Insert records into the search index and remember how far into the log it covers"""
+        try:
+            with self._db_lock, self._db:
+                for record in records:
+                    user_msg = record.get('user_message', '')
+                    resp = record.get('assistant_response', '')
+                    cursor = self._db.execute(
+                        "INSERT INTO interactions (ip, ts, type, session, user_msg, resp, record) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (record.get('ip_address'), record.get('timestamp', ''), record.get('interaction_type'),
+                         record.get('session_id'), user_msg, resp, _dumps(record).decode('utf-8'))
+                    )
+                    self._db.execute(
+                        "INSERT INTO interactions_fts (rowid, user_msg, resp) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, user_msg, resp)
+                    )
+                self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('jsonl_offset', ?)", (offset,))
+        except sqlite3.Error as e:
+            # The index catches up from the stored offset on the next start
+            print(f"Warning: Could not update search index: {e}. Searching the JSONL log instead.")
+            self._db = None
+    
+    def _search_db(
+        self,
+        query: Optional[str],
+        ip_address: Optional[str],
+        interaction_type: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Run search_interactions against the SQLite index"""
+        self._flush_pending()
+        
+        sql = "SELECT record FROM interactions WHERE 1 = 1"
+        params = []
+        if ip_address:
+            sql += " AND ip = ?"
+            params.append(ip_address)
+        if interaction_type:
+            sql += " AND type = ?"
+            params.append(interaction_type)
+        if start_date:
+            sql += " AND ts >= ?"
+            params.append(start_date)
+        if end_date:
+            sql += " AND ts <= ?"
+            params.append(end_date)
+        if query:
+            # Quoted phrase: case-insensitive substring match with the trigram tokenizer
+            sql += " AND rowid IN (SELECT rowid FROM interactions_fts WHERE interactions_fts MATCH ?)"
+            params.append('"' + query.replace('"', '""') + '"')
+        sql += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+        
+        with self._db_lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [_loads(row[0]) for row in rows]
+    
+    def _flush_loop(self):
+        """Background writer: flush queued records every FLUSH_INTERVAL seconds"""
+        last_backup = time.monotonic()
+        while not self._in_memory:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self._flush_pending()
             
-            with open(self.log_file, 'w', encoding='utf-8') as f:
-                json.dump(log, f, indent=2, ensure_ascii=False)
+            if time.monotonic() - last_backup > BACKUP_INTERVAL:
+                self._backup_log()
+                last_backup = time.monotonic()
+    
+    def _backup_log(self):
+        """Snapshot the log file to <log file>.backup (atomically replacing the previous one)"""
+        backup_file = f"{self.log_file}.backup"
+        tmp_file = f"{backup_file}.tmp"
+        try:
+            with self._write_lock:
+                shutil.copyfile(self.log_file, tmp_file)
+            os.replace(tmp_file, backup_file)
         except (IOError, PermissionError, OSError) as e:
-            # In serverless environments, file writes may fail - use in-memory storage
-            print(f"Warning: Could not save to {self.log_file}: {e}. Using in-memory storage.")
-            self._in_memory = True
-            self._memory_storage = log
-        except Exception as e:
-            print(f"Error saving admin log file: {e}")
-            # Don't raise - just use in-memory storage
-            self._in_memory = True
-            self._memory_storage = log
+            print(f"Warning: Could not back up {self.log_file}: {e}")
+    
+    def _flush_and_close(self):
+        """Write any queued records and close the log file (registered with atexit)"""
+        self._flush_pending()
+        with self._write_lock:
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
     
     def log_interaction(
         self, 
@@ -162,6 +599,9 @@ class AdminLogService:
             interaction_type: Type of interaction ('message', 'safety_evaluation', etc.)
             metadata: Optional additional metadata (zipcode, context, etc.)
         """
+        # One timestamp per interaction, shared by the record and the per-IP summary
+        now = now_iso()
+        
         try:
             # Validate inputs
             if not ip_address:
@@ -173,52 +613,26 @@ class AdminLogService:
             if not assistant_response:
                 assistant_response = ''
             
-            log = self._load_log()
-            
-            # Initialize IP entry if it doesn't exist
-            if ip_address not in log:
-                log[ip_address] = {
-                    'first_seen': datetime.now().isoformat(),
-                    'last_seen': datetime.now().isoformat(),
-                    'total_interactions': 0,
-                    'interactions': []
-                }
-            
             # Create interaction entry
             interaction = {
-                'timestamp': datetime.now().isoformat(),
-                'user_message': str(user_message)[:10000],  # Limit message length to prevent file bloat
-                'assistant_response': str(assistant_response)[:10000],  # Limit response length
+                'ip_address': ip_address,
+                'timestamp': now,
+                'user_message': _cap(user_message),  # Limit message length to prevent file bloat
+                'assistant_response': _cap(assistant_response),  # Limit response length
                 'interaction_type': str(interaction_type),
                 'session_id': str(session_id) if session_id else 'unknown'
             }
             
             # Add metadata if provided (limit size to prevent JSON errors)
             if metadata:
-                # Serialize metadata safely
-                safe_metadata = {}
-                for key, value in metadata.items():
-                    try:
-                        # Convert to string if not serializable
-                        if isinstance(value, (str, int, float, bool, type(None))):
-                            safe_metadata[str(key)] = value
-                        else:
-                            safe_metadata[str(key)] = str(value)[:500]  # Limit to 500 chars
-                    except Exception:
-                        safe_metadata[str(key)] = str(value)[:500]
-                interaction['metadata'] = safe_metadata
-            
-            # Add to interactions list
-            log[ip_address]['interactions'].append(interaction)
-            log[ip_address]['last_seen'] = datetime.now().isoformat()
-            log[ip_address]['total_interactions'] = len(log[ip_address]['interactions'])
-            
-            # Keep only last 1000 interactions per IP to prevent file from getting too large
-            if len(log[ip_address]['interactions']) > 1000:
-                log[ip_address]['interactions'] = log[ip_address]['interactions'][-1000:]
-                log[ip_address]['total_interactions'] = len(log[ip_address]['interactions'])
+                # Serialize metadata safely: keep JSON primitives, stringify anything else (max 500 chars)
+                interaction['metadata'] = {
+                    str(key): value if isinstance(value, _JSON_PRIMITIVES) else _cap(value, 500)
+                    for key, value in metadata.items()
+                }
             
-            self._save_log(log)
+            # Append as a single JSONL record; cost no longer grows with the log size
+            self._append_record(interaction)
             # Debug: Print confirmation that log was saved (only if not in-memory)
             if not self._in_memory:
                 print(f"[Admin Log] Saved interaction to {self.log_file} - IP: {ip_address}, Type: {interaction_type}")
@@ -232,18 +646,17 @@ class AdminLogService:
             self._in_memory = True
             # Try to save to in-memory storage as fallback
             try:
-                if ip_address not in self._memory_storage:
-                    self._memory_storage[ip_address] = {'interactions': []}
                 interaction = {
-                    'timestamp': datetime.now().isoformat(),
-                    'user_message': str(user_message)[:10000],
-                    'assistant_response': str(assistant_response)[:10000],
+                    'ip_address': ip_address,
+                    'timestamp': now,
+                    'user_message': _cap(user_message),
+                    'assistant_response': _cap(assistant_response),
                     'interaction_type': str(interaction_type),
                     'session_id': str(session_id) if session_id else 'unknown'
                 }
                 if metadata:
                     interaction['metadata'] = metadata
-                self._memory_storage[ip_address]['interactions'].append(interaction)
+                self._update_index(interaction)
             except Exception:
                 pass  # Even in-memory save failed, just give up silently
     
@@ -258,12 +671,13 @@ class AdminLogService:
         Returns:
             List of interactions for the IP address
         """
-        log = self._load_log()
-        
-        if ip_address not in log:
-            return []
-        
-        interactions = log[ip_address].get('interactions', [])
+        self._refresh_index()
+        with self._lock:
+            if ip_address not in self._index:
+                return []
+            
+            # Served from the in-memory window of the most recent interactions
+            interactions = list(self._index[ip_address]['interactions'])
         
         if limit:
             return interactions[-limit:]
@@ -272,8 +686,9 @@ class AdminLogService:
     
     def get_all_ips(self) -> List[str]:
         """Get list of all IP addresses in the log"""
-        log = self._load_log()
-        return list(log.keys())
+        self._refresh_index()
+        with self._lock:
+            return list(self._index.keys())
     
     def get_ip_stats(self, ip_address: str) -> Optional[Dict[str, Any]]:
         """
@@ -285,39 +700,31 @@ class AdminLogService:
         Returns:
             Dictionary with IP statistics or None if IP not found
         """
-        log = self._load_log()
-        
-        if ip_address not in log:
+        self._refresh_index()
+        with self._lock:
+            return self._compute_stats(ip_address, self._index.get(ip_address))
+    
+    @staticmethod
+    def _compute_stats(ip_address: str, ip_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Build the statistics dict for one IP from its index entry"""
+        if ip_data is None:
             return None
         
-        ip_data = log[ip_address]
-        
-        # Calculate additional stats
-        interactions = ip_data.get('interactions', [])
-        
-        # Count interaction types
-        interaction_types = defaultdict(int)
-        for interaction in interactions:
-            interaction_type = interaction.get('interaction_type', 'unknown')
-            interaction_types[interaction_type] += 1
-        
         return {
             'ip_address': ip_address,
             'first_seen': ip_data.get('first_seen'),
             'last_seen': ip_data.get('last_seen'),
             'total_interactions': ip_data.get('total_interactions', 0),
-            'interaction_type_counts': dict(interaction_types)
+            'interaction_type_counts': dict(ip_data['type_counts'])
         }
     
     def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
         """Get statistics for all IP addresses"""
-        log = self._load_log()
-        
-        stats = {}
-        for ip_address in log.keys():
-            stats[ip_address] = self.get_ip_stats(ip_address)
+        self._refresh_index()
+        with self._lock:
+            entries = list(self._index.items())
         
-        return stats
+        return {ip_address: self._compute_stats(ip_address, ip_data) for ip_address, ip_data in entries}
     
     def search_interactions(
         self,
@@ -342,43 +749,37 @@ class AdminLogService:
         Returns:
             List of matching interactions with IP addresses
         """
-        log = self._load_log()
         results = []
         
-        # Determine which IPs to search
-        ips_to_search = [ip_address] if ip_address else log.keys()
+        # Indexed lookup in SQLite when available (short queries can't use the trigram index)
+        if self._db is not None and not self._in_memory and (not query or len(query) >= FTS_MIN_QUERY_LENGTH):
+            try:
+                return self._search_db(query, ip_address, interaction_type, start_date, end_date, limit)
+            except sqlite3.Error as e:
+                print(f"Warning: Search index query failed: {e}. Scanning the JSONL log instead.")
+        
+        # IP, date range and query text are prefiltered on the raw log bytes before parsing
+        query_lower = query.lower() if query else None
         
-        for ip in ips_to_search:
-            if ip not in log:
+        for interaction in self._iter_records(ip_address, start_date, end_date, text=query):
+            # Apply remaining filters
+            if interaction_type and interaction.get('interaction_type') != interaction_type:
                 continue
             
-            interactions = log[ip].get('interactions', [])
-            
-            for interaction in interactions:
-                # Apply filters
-                if interaction_type and interaction.get('interaction_type') != interaction_type:
-                    continue
-                
-                timestamp = interaction.get('timestamp', '')
-                if start_date and timestamp < start_date:
-                    continue
-                if end_date and timestamp > end_date:
+            if query_lower:
+                user_msg = interaction.get('user_message', '').lower()
+                assistant_resp = interaction.get('assistant_response', '').lower()
+                if query_lower not in user_msg and query_lower not in assistant_resp:
                     continue
-                
-                if query:
-                    query_lower = query.lower()
-                    user_msg = interaction.get('user_message', '').lower()
-                    assistant_resp = interaction.get('assistant_response', '').lower()
-                    if query_lower not in user_msg and query_lower not in assistant_resp:
-                        continue
-                
-                # Add IP address to interaction
-                result = interaction.copy()
-                result['ip_address'] = ip
-                results.append(result)
+            
+            results.append(interaction)
         
         # Sort by timestamp (most recent first)
         results.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
         
         return results[:limit]
 
+@functools.lru_cache(maxsize=None)
+def get_admin_log_service() -> AdminLogService:
+    """Shared AdminLogService, created on first use (one writer and index per process)"""
+    return AdminLogService()
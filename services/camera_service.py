@@ -6,10 +6,43 @@ Simple node-based system with coordinates
 
 import json
 import os
-from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from services.time_utils import now_iso
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Image used for cameras without a snapshot
+DEFAULT_IMAGE_PATH = '/static/images/camera-placeholder.jpg'
+
+# Snapshot images in camera_snapshots/ used as placeholders, in assignment order
+PLACEHOLDER_IMAGE_NAMES = ('CRP-SH358.jpg', 'sh286@hawthorne.jpg', 'sh358@ayers.jpg')
+
+# Default Corpus Christi camera locations: (name, lat, lng)
+DEFAULT_CAMERAS = [
+    ('IH-37 at SH-359', 27.7564, -97.4042),
+    ('IH-37 at Weber Road', 27.7834, -97.4132),
+    ('IH-37 at SPID', 27.7225, -97.3956),
+    ('IH-37 at Ayers Street', 27.7912, -97.4215),
+    ('US-181 at SH-361', 27.7134, -97.3718),
+    ('US-181 at Port Avenue', 27.7345, -97.3829),
+    ('SPID at Staples Street', 27.7089, -97.3934),
+    ('SPID at Airline Road', 27.7167, -97.4012),
+]
+
+
+@lru_cache(maxsize=1)
+def _placeholder_images(snapshot_dir: Path) -> List[str]:
+    """API paths of the placeholder snapshot images that exist in snapshot_dir"""
+    return [f'/api/cameras/image/{name}' for name in PLACEHOLDER_IMAGE_NAMES
+            if (snapshot_dir / name).exists()]
+
 
 class CameraService:
     """Service for managing camera locations with dummy data"""
@@ -29,146 +62,53 @@ class CameraService:
         self.data_file = Path(data_file)
         self._in_memory = False
         self._memory_storage = {'cameras': []}  # Fallback in-memory storage
+        self._cache = None  # Parsed cameras list, valid while the file's mtime is unchanged
+        self._cache_mtime = 0
+        self._by_id = {}  # camera id -> camera dict, for the list in self._indexed
+        self._max_id = 0
+        self._indexed = None
         self._ensure_data_file()
         
     def _ensure_data_file(self):
         """Create the data file with default dummy cameras if it doesn't exist"""
-        import os
+        now = now_iso()
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        img_paths = _placeholder_images(Path(project_root) / 'camera_snapshots')
+        
+        def placeholder(i):
+            # Assign the available snapshot images cyclically
+            return img_paths[i % len(img_paths)] if img_paths else DEFAULT_IMAGE_PATH
+        
         try:
             if not self.data_file.exists():
-                # Get available placeholder images from camera_snapshots directory
-                project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                snapshot_dir = Path(project_root) / 'camera_snapshots'
-                placeholder_images = []
-                
-                # Look for the three images: CRP-SH358.jpg, sh286@hawthorne.jpg, sh358@ayers.jpg
-                available_images = [
-                    'CRP-SH358.jpg',
-                    'sh286@hawthorne.jpg',
-                    'sh358@ayers.jpg'
-                ]
-                
-                # Check which images actually exist
-                for img_name in available_images:
-                    img_path = snapshot_dir / img_name
-                    if img_path.exists():
-                        placeholder_images.append(f'/api/cameras/image/{img_name}')
-                
                 # Default Corpus Christi camera locations with placeholder images
                 default_cameras = [
                     {
-                        'id': 1,
-                        'location': {
-                            'name': 'IH-37 at SH-359',
-                            'lat': 27.7564,
-                            'lng': -97.4042
-                        },
-                        'image_path': placeholder_images[0] if len(placeholder_images) > 0 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    {
-                        'id': 2,
-                        'location': {
-                            'name': 'IH-37 at Weber Road',
-                            'lat': 27.7834,
-                            'lng': -97.4132
-                        },
-                        'image_path': placeholder_images[1] if len(placeholder_images) > 1 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    {
-                        'id': 3,
-                        'location': {
-                            'name': 'IH-37 at SPID',
-                            'lat': 27.7225,
-                            'lng': -97.3956
-                        },
-                        'image_path': placeholder_images[2] if len(placeholder_images) > 2 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    {
-                        'id': 4,
-                        'location': {
-                            'name': 'IH-37 at Ayers Street',
-                            'lat': 27.7912,
-                            'lng': -97.4215
-                        },
-                        'image_path': placeholder_images[0] if len(placeholder_images) > 0 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    {
-                        'id': 5,
+                        'id': i + 1,
                         'location': {
-                            'name': 'US-181 at SH-361',
-                            'lat': 27.7134,
-                            'lng': -97.3718
+                            'name': name,
+                            'lat': lat,
+                            'lng': lng
                         },
-                        'image_path': placeholder_images[1] if len(placeholder_images) > 1 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    {
-                        'id': 6,
-                        'location': {
-                            'name': 'US-181 at Port Avenue',
-                            'lat': 27.7345,
-                            'lng': -97.3829
-                        },
-                        'image_path': placeholder_images[2] if len(placeholder_images) > 2 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    {
-                        'id': 7,
-                        'location': {
-                            'name': 'SPID at Staples Street',
-                            'lat': 27.7089,
-                            'lng': -97.3934
-                        },
-                        'image_path': placeholder_images[0] if len(placeholder_images) > 0 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    {
-                        'id': 8,
-                        'location': {
-                            'name': 'SPID at Airline Road',
-                            'lat': 27.7167,
-                            'lng': -97.4012
-                        },
-                        'image_path': placeholder_images[1] if len(placeholder_images) > 1 else '/static/images/camera-placeholder.jpg',
-                        'timestamp': datetime.now().isoformat()
+                        'image_path': placeholder(i),
+                        'timestamp': now
                     }
+                    for i, (name, lat, lng) in enumerate(DEFAULT_CAMERAS)
                 ]
                 
                 self._save_cameras(default_cameras)
             else:
                 # Update existing cameras to use the placeholder images if they don't have proper image paths
-                import os
                 cameras = self._load_cameras()
                 updated = False
                 
-                project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                snapshot_dir = Path(project_root) / 'camera_snapshots'
-                available_images = [
-                    'CRP-SH358.jpg',
-                    'sh286@hawthorne.jpg',
-                    'sh358@ayers.jpg'
-                ]
-                
-                # Build image paths
-                placeholder_images = []
-                for img_name in available_images:
-                    img_path = snapshot_dir / img_name
-                    if img_path.exists():
-                        placeholder_images.append(f'/api/cameras/image/{img_name}')
-                
                 # Update cameras that are using old placeholder paths
                 for i, camera in enumerate(cameras):
                     old_path = camera.get('image_path', '')
-                    if '/static/images/camera-placeholder.jpg' in old_path or not old_path:
-                        # Assign one of the placeholder images cyclically
-                        img_index = i % len(placeholder_images) if placeholder_images else 0
-                        camera['image_path'] = placeholder_images[img_index] if placeholder_images else '/static/images/camera-placeholder.jpg'
+                    if DEFAULT_IMAGE_PATH in old_path or not old_path:
+                        camera['image_path'] = placeholder(i)
                         if 'timestamp' not in camera:
-                            camera['timestamp'] = datetime.now().isoformat()
+                            camera['timestamp'] = now
                         updated = True
                 
                 if updated:
@@ -182,13 +122,30 @@ class CameraService:
     def _load_cameras(self) -> List[Dict[str, Any]]:
         """Load cameras from JSON file"""
         if self._in_memory:
-            return self._memory_storage.get('cameras', [])
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                return data.get('cameras', [])
-        except (json.JSONDecodeError, FileNotFoundError, IOError, PermissionError):
-            return []
+            cameras = self._memory_storage.get('cameras', [])
+        else:
+            try:
+                st = os.stat(self.data_file)
+                if self._cache is None or st.st_mtime_ns != self._cache_mtime:
+                    with open(self.data_file, 'rb') as f:
+                        raw = f.read()
+                    data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+                    self._cache = data.get('cameras', [])
+                    self._cache_mtime = st.st_mtime_ns
+                cameras = self._cache
+            except (json.JSONDecodeError, FileNotFoundError, IOError, PermissionError):
+                return []
+        
+        # Rebuild the id index whenever a different list is loaded
+        if cameras is not self._indexed:
+            self._by_id = {}
+            for camera in cameras:
+                # First camera wins for duplicate ids, as with a linear scan
+                self._by_id.setdefault(camera.get('id'), camera)
+            self._max_id = max((c.get('id', 0) for c in cameras), default=0)
+            self._indexed = cameras
+        
+        return cameras
     
     def _save_cameras(self, cameras: List[Dict[str, Any]]):
         """Save cameras to JSON file"""
@@ -196,8 +153,18 @@ class CameraService:
             self._memory_storage = {'cameras': cameras}
             return
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump({'cameras': cameras}, f, indent=2)
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps({'cameras': cameras}, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps({'cameras': cameras}, indent=2).encode('utf-8')
+            # Write to a temp file and swap it in atomically so readers never see a partial file
+            tmp_file = f"{self.data_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.data_file)
+            
+            self._cache = cameras
+            self._cache_mtime = os.stat(self.data_file).st_mtime_ns
         except (IOError, PermissionError, OSError) as e:
             # In serverless environments, file writes may fail - use in-memory storage
             print(f"Warning: Could not save to {self.data_file}: {e}. Using in-memory storage.")
@@ -210,11 +177,8 @@ class CameraService:
     
     def get_camera_by_id(self, camera_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific camera by ID"""
-        cameras = self._load_cameras()
-        for camera in cameras:
-            if camera.get('id') == camera_id:
-                return camera
-        return None
+        self._load_cameras()
+        return self._by_id.get(camera_id)
     
     def add_camera(self, name: str, lat: float, lng: float) -> Dict[str, Any]:
         """
@@ -231,8 +195,7 @@ class CameraService:
         cameras = self._load_cameras()
         
         # Generate new ID
-        max_id = max([c.get('id', 0) for c in cameras], default=0)
-        camera_id = max_id + 1
+        camera_id = self._max_id + 1
         
         camera = {
             'id': camera_id,
@@ -241,11 +204,13 @@ class CameraService:
                 'lat': lat,
                 'lng': lng
             },
-            'image_path': '/static/images/camera-placeholder.jpg',
-            'timestamp': datetime.now().isoformat()
+            'image_path': DEFAULT_IMAGE_PATH,
+            'timestamp': now_iso()
         }
         
         cameras.append(camera)
+        self._by_id[camera_id] = camera
+        self._max_id = camera_id
         self._save_cameras(cameras)
         
         return camera
@@ -264,22 +229,22 @@ class CameraService:
             Updated camera dictionary or None if not found
         """
         cameras = self._load_cameras()
+        camera = self._by_id.get(camera_id)
         
-        for camera in cameras:
-            if camera.get('id') == camera_id:
-                if lat is not None:
-                    camera['location']['lat'] = lat
-                if lng is not None:
-                    camera['location']['lng'] = lng
-                if name is not None:
-                    camera['location']['name'] = name
-                
-                camera['timestamp'] = datetime.now().isoformat()
-                
-                self._save_cameras(cameras)
-                return camera
+        if camera is None:
+            return None
+        
+        if lat is not None:
+            camera['location']['lat'] = lat
+        if lng is not None:
+            camera['location']['lng'] = lng
+        if name is not None:
+            camera['location']['name'] = name
+        
+        camera['timestamp'] = now_iso()
         
-        return None
+        self._save_cameras(cameras)
+        return camera
     
     def delete_camera(self, camera_id: int) -> bool:
         """
@@ -289,12 +254,15 @@ class CameraService:
             True if deleted, False if not found
         """
         cameras = self._load_cameras()
-        initial_count = len(cameras)
         
-        cameras = [c for c in cameras if c.get('id') != camera_id]
+        camera = self._by_id.pop(camera_id, None)
+        if camera is None:
+            return False
         
-        if len(cameras) < initial_count:
-            self._save_cameras(cameras)
-            return True
+        # Remove in place so the list (and the id index built from it) stays current
+        del cameras[next(i for i, c in enumerate(cameras) if c is camera)]
+        if camera_id == self._max_id:
+            self._max_id = max((c.get('id', 0) for c in cameras), default=0)
         
-        return False
+        self._save_cameras(cameras)
+        return True
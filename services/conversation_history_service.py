@@ -1,15 +1,50 @@
 """
 Conversation History Service
-Manages conversation history logging in JSON format
+Manages conversation history in a SQLite database (WAL mode)
 """
 
+import atexit
 import json
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Messages kept per session
+MAX_MESSAGES_PER_SESSION = 100
+
+# Sessions whose recent messages are kept in memory
+MAX_CACHED_SESSIONS = 1000
+
+# New messages are written by a background thread every FLUSH_INTERVAL seconds,
+# or sooner once FLUSH_BATCH_SIZE messages are waiting
+FLUSH_INTERVAL = 5
+FLUSH_BATCH_SIZE = 20
+
+# Seconds between trims of sessions that grew past MAX_MESSAGES_PER_SESSION
+TRIM_INTERVAL = 60
+
+def _dumps(obj: Any) -> str:
+    """Encode obj as compact JSON (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+def _loads(data) -> Any:
+    """Decode JSON text or bytes (orjson when available)"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
 class ConversationHistoryService:
-    """Service for managing conversation history in JSON format"""
+    """Service for managing conversation history in SQLite"""
     
     def __init__(self, db_file: str = None):
         # Detect serverless environment and use /tmp if needed
@@ -18,52 +53,181 @@ class ConversationHistoryService:
         if db_file is None:
             if is_serverless:
                 # Use /tmp for serverless environments
-                db_file = '/tmp/conversation_history.json'
+                db_file = '/tmp/conversation_history.db'
             else:
                 # Use root directory for local development
-                db_file = 'conversation_history.json'
+                db_file = 'conversation_history.db'
         
         self.db_file = db_file
+        # Whole-file JSON history written by earlier versions, imported on first start
+        self.legacy_file = os.path.splitext(db_file)[0] + '.json'
         self._in_memory = False
-        self._memory_storage = {}  # Fallback in-memory storage
-        self._ensure_db_file()
+        self._lock = threading.Lock()  # guards _cache and _pending
+        self._db_lock = threading.Lock()  # guards _db; taken before _lock when both are needed
+        self._last_trim = time.monotonic()
+        self._db = self._open_db()
+        
+        # Recent messages per session (least recently used sessions are evicted)
+        self._cache = OrderedDict()  # session_id -> deque of message dicts
+        # (session_id, message) pairs not yet written to the database
+        self._pending = []
+        self._wake = threading.Event()
+        
+        threading.Thread(target=self._flush_loop, name='conversation-history-flush', daemon=True).start()
+        atexit.register(self._flush_pending)
     
-    def _ensure_db_file(self):
-        """Create the JSON database file if it doesn't exist"""
+    def _open_db(self) -> sqlite3.Connection:
+        """Open (creating if needed) the SQLite database, falling back to an in-memory database"""
         try:
-            if not os.path.exists(self.db_file):
-                with open(self.db_file, 'w') as f:
-                    json.dump({}, f)
-        except (IOError, PermissionError, OSError) as e:
+            db = self._connect(self.db_file)
+            if os.path.exists(self.legacy_file):
+                self._migrate_legacy_history(db)
+            return db
+        except (sqlite3.Error, IOError, PermissionError, OSError) as e:
             # In serverless environments (like Vercel), file writes may not be allowed
             # This is okay - we'll work with in-memory data instead
-            print(f"Warning: Could not create {self.db_file}: {e}. Using in-memory storage.")
+            print(f"Warning: Could not open {self.db_file}: {e}. Using in-memory storage.")
             self._in_memory = True
+            return self._connect(':memory:')
     
-    def _load_history(self) -> Dict[str, Any]:
-        """Load all conversation history from JSON file"""
-        if self._in_memory:
-            return self._memory_storage
-        try:
-            with open(self.db_file, 'r') as f:
-                history = json.load(f)
-                return history if isinstance(history, dict) else {}
-        except (json.JSONDecodeError, FileNotFoundError, IOError, PermissionError):
-            return {}
+    def _connect(self, path: str) -> sqlite3.Connection:
+        """Connect in autocommit mode with WAL journaling and create the schema"""
+        db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        if path != ':memory:':
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                idx INTEGER PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                ts TEXT,
+                role TEXT,
+                content TEXT,
+                metadata TEXT
+            );
+            CREATE INDEX IF NOT EXISTS messages_session_idx ON messages (session_id, idx);
+        """)
+        return db
     
-    def _save_history(self, history: Dict[str, Any]):
-        """Save conversation history to JSON file"""
-        if self._in_memory:
-            self._memory_storage = history
-            return
+    def _migrate_legacy_history(self, db: sqlite3.Connection):
+        """Import a whole-file conversation_history.json ({session_id: [messages]}) and rename it"""
         try:
-            with open(self.db_file, 'w') as f:
-                json.dump(history, f, indent=2)
-        except (IOError, PermissionError, OSError) as e:
-            # In serverless environments, file writes may fail - use in-memory storage
-            print(f"Warning: Could not save to {self.db_file}: {e}. Using in-memory storage.")
-            self._in_memory = True
-            self._memory_storage = history
+            with open(self.legacy_file, 'rb') as f:
+                history = _loads(f.read())
+        except (json.JSONDecodeError, IOError, PermissionError):
+            return
+        
+        rows = []
+        for session_id, messages in (history.items() if isinstance(history, dict) else ()):
+            if not isinstance(messages, list):
+                continue
+            for msg in messages[-MAX_MESSAGES_PER_SESSION:]:
+                metadata = msg.get('metadata')
+                rows.append((
+                    session_id, msg.get('timestamp'), msg.get('role'), msg.get('content'),
+                    _dumps(metadata) if metadata else None
+                ))
+        
+        with db:
+            db.execute('BEGIN')
+            db.executemany(
+                'INSERT INTO messages (session_id, ts, role, content, metadata) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        os.replace(self.legacy_file, self.legacy_file + '.migrated')
+        print(f"Migrated {len(rows)} messages from {self.legacy_file} to {self.db_file}")
+    
+    def _trim_sessions(self):
+        """Delete messages beyond the newest MAX_MESSAGES_PER_SESSION of each session"""
+        self._db.execute("""
+            DELETE FROM messages WHERE idx IN (
+                SELECT idx FROM (
+                    SELECT idx, ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY idx DESC) AS rn
+                    FROM messages
+                ) WHERE rn > ?
+            )
+        """, (MAX_MESSAGES_PER_SESSION,))
+    
+    def _flush_loop(self):
+        """Background writer: flush pending messages every FLUSH_INTERVAL seconds"""
+        while True:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self._flush_pending()
+    
+    def _flush_pending(self):
+        """Write all pending messages in one transaction and trim oversized sessions periodically"""
+        with self._db_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            
+            try:
+                if batch:
+                    with self._db:
+                        self._db.execute('BEGIN')
+                        self._db.executemany(
+                            'INSERT INTO messages (session_id, ts, role, content, metadata) VALUES (?, ?, ?, ?, ?)',
+                            [
+                                (
+                                    session_id, msg['timestamp'], msg['role'], msg['content'],
+                                    _dumps(msg['metadata']) if 'metadata' in msg else None
+                                )
+                                for session_id, msg in batch
+                            ]
+                        )
+                
+                # Keep only the last MAX_MESSAGES_PER_SESSION messages per session; reads already
+                # return at most that many, so the older rows are deleted in periodic batches
+                now = time.monotonic()
+                if now - self._last_trim >= TRIM_INTERVAL:
+                    self._last_trim = now
+                    self._trim_sessions()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not write conversation history to {self.db_file}: {e}")
+    
+    def _load_session(self, session_id: str) -> deque:
+        """Read a session's recent messages from the database (call with _db_lock held)"""
+        rows = self._db.execute("""
+            SELECT role, content, ts, metadata FROM (
+                SELECT idx, role, content, ts, metadata FROM messages
+                WHERE session_id = ? ORDER BY idx DESC LIMIT ?
+            ) ORDER BY idx
+        """, (session_id, MAX_MESSAGES_PER_SESSION)).fetchall()
+        
+        messages = deque(maxlen=MAX_MESSAGES_PER_SESSION)
+        for role, content, ts, metadata in rows:
+            message = {
+                'role': role,
+                'content': content,
+                'timestamp': ts
+            }
+            if metadata:
+                message['metadata'] = _loads(metadata)
+            messages.append(message)
+        return messages
+    
+    def _session(self, session_id: str) -> deque:
+        """Cached message deque for a session, loading it from the database on first use"""
+        with self._lock:
+            messages = self._cache.get(session_id)
+            if messages is not None:
+                self._cache.move_to_end(session_id)
+                return messages
+        
+        # Holding _db_lock keeps the flusher from moving pending messages into the
+        # database between the read and the merge below
+        with self._db_lock:
+            loaded = self._load_session(session_id)
+            with self._lock:
+                messages = self._cache.get(session_id)
+                if messages is not None:
+                    return messages
+                # Messages added while the session was evicted may not be written yet
+                loaded.extend(msg for sid, msg in self._pending if sid == session_id)
+                self._cache[session_id] = loaded
+                if len(self._cache) > MAX_CACHED_SESSIONS:
+                    self._cache.popitem(last=False)
+                return loaded
     
     def get_conversation_history(self, session_id: str = 'default', exclude_system: bool = True) -> List[Dict[str, Any]]:
         """
@@ -76,11 +240,9 @@ class ConversationHistoryService:
         Returns:
             List of conversation messages
         """
-        history = self._load_history()
-        session_history = history.get(session_id, [])
-        
-        if not isinstance(session_history, list):
-            return []
+        messages = self._session(session_id)
+        with self._lock:
+            session_history = list(messages)
         
         # Filter out system-generated messages if requested
         if exclude_system:
@@ -104,11 +266,6 @@ class ConversationHistoryService:
             content: Message content
             metadata: Optional metadata (context, timestamp, etc.)
         """
-        history = self._load_history()
-        
-        if session_id not in history:
-            history[session_id] = []
-        
         message = {
             'role': role,
             'content': content,
@@ -118,23 +275,26 @@ class ConversationHistoryService:
         if metadata:
             message['metadata'] = metadata
         
-        history[session_id].append(message)
-        
-        # Keep only last 100 messages per session to prevent file from getting too large
-        if len(history[session_id]) > 100:
-            history[session_id] = history[session_id][-100:]
-        
-        self._save_history(history)
+        # Appending never reads the session: a cached session gets the message directly, and an
+        # uncached one picks it up from _pending (or the database) when it is first read
+        with self._lock:
+            messages = self._cache.get(session_id)
+            if messages is not None:
+                messages.append(message)
+            self._pending.append((session_id, message))
+            if len(self._pending) >= FLUSH_BATCH_SIZE:
+                self._wake.set()
     
     def clear_session(self, session_id: str):
         """Clear conversation history for a specific session"""
-        history = self._load_history()
-        if session_id in history:
-            history[session_id] = []
-            self._save_history(history)
+        with self._db_lock:
+            with self._lock:
+                self._cache[session_id] = deque(maxlen=MAX_MESSAGES_PER_SESSION)
+                self._pending = [(sid, msg) for sid, msg in self._pending if sid != session_id]
+            self._db.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
     
     def get_all_sessions(self) -> List[str]:
         """Get list of all session IDs"""
-        history = self._load_history()
-        return list(history.keys())
-
+        self._flush_pending()
+        with self._db_lock:
+            return [row[0] for row in self._db.execute('SELECT DISTINCT session_id FROM messages ORDER BY session_id')]
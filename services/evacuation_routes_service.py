@@ -3,18 +3,314 @@ Evacuation Routes Service
 Fetches actual evacuation route coordinates from OpenStreetMap using OSRM
 """
 
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional
+from urllib3.util.retry import Retry
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Decimal places of the polyline6 geometries requested from OSRM
+POLYLINE_PRECISION = 6
+
+# OSRM geometry detail: 'simplified' is visually identical on the city map at a fraction of
+# the payload; 'full' returns every OSM shape point (for turn-by-turn navigation)
+DEFAULT_OVERVIEW = 'simplified'
+
+# Per-request (connect, read) timeouts for OSRM, and the wall-clock budget for fetching all
+# routes; routes still missing after the budget fall back to a straight line
+OSRM_CONNECT_TIMEOUT = 3
+OSRM_READ_TIMEOUT = 7
+ROUTES_FETCH_BUDGET = 10
+
+# Retries for failed OSRM connections and transient gateway errors, with exponential backoff
+OSRM_RETRIES = 3
+OSRM_RETRY_BACKOFF = 0.5
+OSRM_RETRY_STATUSES = (502, 503, 504)
+
+# Route geometries are cached on disk and refreshed from OSRM after this many days
+CACHE_TTL_DAYS = 7
+
+# Evacuation routes for Corpus Christi; coordinates are filled in from OSRM
+ROUTES_CONFIG = [
+    {
+        'id': 1,
+        'name': 'North Route - I-37',
+        'highway': 'Interstate 37 (I-37)',
+        'description': 'Primary northbound evacuation route via Interstate 37',
+        'nextCity': 'San Antonio',
+        'distance': '150 miles',
+        'color': '#e67e22',
+        'weight': 5,
+        'start': [27.8006, -97.3964],  # Corpus Christi center
+        'end': [29.4241, -98.4936]      # San Antonio
+    },
+    {
+        'id': 2,
+        'name': 'West Route - US-181',
+        'highway': 'US Highway 181',
+        'description': 'Westbound evacuation route via US-181 to Victoria',
+        'nextCity': 'Victoria',
+        'distance': '45 miles',
+        'color': '#3498db',
+        'weight': 5,
+        'start': [27.8006, -97.3964],  # Corpus Christi center
+        'end': [28.8053, -97.0036]     # Victoria
+    },
+    {
+        'id': 3,
+        'name': 'Northwest Route - SH-44',
+        'highway': 'State Highway 44',
+        'description': 'Northwest evacuation route via SH-44',
+        'nextCity': 'Alice',
+        'distance': '35 miles',
+        'color': '#2ecc71',
+        'weight': 5,
+        'start': [27.8006, -97.3964],  # Corpus Christi center
+        'end': [27.7522, -98.0700]     # Alice
+    },
+    {
+        'id': 4,
+        'name': 'South Route - SH-358',
+        'highway': 'State Highway 358 (SPID)',
+        'description': 'South evacuation route via SH-358 (South Padre Island Drive)',
+        'nextCity': 'Padre Island',
+        'distance': '15 miles',
+        'color': '#9b59b6',
+        'weight': 5,
+        'start': [27.7225, -97.3956],  # SPID/I-37 area
+        'end': [27.6150, -97.2200]     # Padre Island area
+    },
+    {
+        'id': 5,
+        'name': 'East Route - SH-358/Portland',
+        'highway': 'SH-358 East to Portland',
+        'description': 'Eastbound evacuation route via SH-358 to Portland and beyond',
+        'nextCity': 'Portland',
+        'distance': '8 miles',
+        'color': '#f39c12',
+        'weight': 5,
+        'start': [27.7225, -97.3956],  # SPID/I-37
+        'end': [27.8774, -97.3187]     # Portland
+    },
+    {
+        'id': 6,
+        'name': 'SH-43 Evacuation Route',
+        'highway': 'State Highway 43',
+        'description': 'Evacuation route via State Highway 43 to Mathis and beyond',
+        'nextCity': 'Mathis',
+        'distance': '30 miles',
+        'color': '#d35400',
+        'weight': 5,
+        'start': [27.8006, -97.3964],  # Corpus Christi center (SH-43 begins here)
+        'end': [28.0936, -97.8281]     # Mathis (SH-43 continues north)
+    },
+    {
+        'id': 7,
+        'name': 'Coastal Route - SH-357',
+        'highway': 'State Highway 357',
+        'description': 'Coastal evacuation route via SH-357 along the bay',
+        'nextCity': 'Port Aransas',
+        'distance': '25 miles',
+        'color': '#16a085',
+        'weight': 4,
+        'start': [27.8006, -97.3964],  # Corpus Christi center
+        'end': [27.8339, -97.0614]     # Port Aransas area
+    },
+    {
+        'id': 8,
+        'name': 'SH-43 / FM 2444 Route',
+        'highway': 'State Highway 43 / FM 2444',
+        'description': 'North evacuation route via SH-43 and FM 2444',
+        'nextCity': 'Beeville',
+        'distance': '40 miles',
+        'color': '#8e44ad',
+        'weight': 5,
+        'start': [27.8006, -97.3964],  # Corpus Christi center (SH-43 begins)
+        'end': [28.4009, -97.7481]     # Beeville area (via FM 2444)
+    },
+    {
+        'id': 9,
+        'name': 'South Staples St to FM 2444',
+        'highway': 'Staples Street / FM 2444',
+        'description': 'North evacuation route from South Staples Street to FM 2444',
+        'nextCity': 'Beeville',
+        'distance': '45 miles',
+        'color': '#1abc9c',
+        'weight': 5,
+        'start': [27.7089, -97.3934],  # SPID at Staples Street (South Staples Street intersection)
+        'end': [28.4009, -97.7481]     # FM 2444 / Beeville area
+    }
+]
+
+
+def _loads(data: bytes) -> Any:
+    """Decode JSON bytes (orjson when available)"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _dumps(obj: Any) -> bytes:
+    """Encode obj as compact JSON bytes (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def decode_polyline(encoded: str, precision: int = POLYLINE_PRECISION) -> List[List[float]]:
+    """
+    Decode an encoded polyline (Google polyline algorithm, as returned by OSRM)
+    
+    Args:
+        encoded: Encoded polyline string
+        precision: Number of decimal places encoded (6 for OSRM's polyline6)
+    
+    Returns:
+        List of [lat, lng] coordinates
+    """
+    factor = 10 ** precision
+    if NUMPY_AVAILABLE:
+        return _decode_polyline_numpy(encoded, factor)
+    
+    coords = []
+    index = lat = lng = 0
+    length = len(encoded)
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            result = shift = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        coords.append([lat / factor, lng / factor])
+    return coords
+
+def _decode_polyline_numpy(encoded: str, factor: int) -> List[List[float]]:
+    """Vectorized decode_polyline: one pass of array operations instead of a per-character loop"""
+    chunks = np.frombuffer(encoded.encode('ascii'), dtype=np.uint8).astype(np.int64) - 63
+    if chunks.size == 0:
+        return []
+    
+    # Each value is a run of 5-bit chunks; the last chunk of a run has the 0x20 bit clear
+    ends = np.flatnonzero(chunks < 0x20)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = 5 * (np.arange(ends[-1] + 1) - np.repeat(starts, ends - starts + 1))
+    values = np.add.reduceat((chunks[:ends[-1] + 1] & 0x1f) << shifts, starts)
+    
+    # Undo the zigzag sign encoding, then accumulate the (lat, lng) deltas
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    deltas = deltas[:deltas.size // 2 * 2].reshape(-1, 2)
+    return (np.cumsum(deltas, axis=0) / factor).tolist()
 
 class EvacuationRoutesService:
     """Service for fetching evacuation routes from OpenStreetMap via OSRM"""
     
-    def __init__(self):
+    def __init__(self, cache_file: str = None):
         self.osrm_url = "https://router.project-osrm.org/route/v1/driving"
+        
+        # Keep-alive connection pool for OSRM requests, retrying transient gateway errors
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(total=OSRM_RETRIES, backoff_factor=OSRM_RETRY_BACKOFF,
+                              status_forcelist=OSRM_RETRY_STATUSES)
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip'})
+        
+        if cache_file is None:
+            # Use /tmp for serverless environments (only writable location)
+            is_serverless = os.getenv('VERCEL') or os.getenv('LAMBDA_TASK_ROOT') or os.getenv('SERVERLESS')
+            cache_file = '/tmp/evacuation_routes.cache.json' if is_serverless else 'evacuation_routes.cache.json'
+        self.cache_file = cache_file
+        self.cache_ttl = CACHE_TTL_DAYS * 86400
+        
+        self._routes = None  # routes served from memory until _routes_expire_at
+        self._routes_expire_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_timer = None
+    
+    def _route_url(self, start_lat: float, start_lng: float, end_lat: float, end_lng: float) -> str:
+        """OSRM route URL (OSRM expects longitude,latitude pairs)"""
+        return f"{self.osrm_url}/{start_lng},{start_lat};{end_lng},{end_lat}"
+    
+    def _route_params(self, overview: str = DEFAULT_OVERVIEW) -> Dict[str, str]:
+        """Query parameters for OSRM route requests ('simplified' or 'full' overview)"""
+        return {
+            'overview': overview,
+            'geometries': 'polyline6',
+            'steps': 'false',
+            'alternatives': 'false'
+        }
+    
+    def _parse_route(self, status_code: int, data: Dict[str, Any], start_lat: float, start_lng: float,
+                     end_lat: float, end_lng: float) -> List[List[float]]:
+        """
+        Extract route coordinates from an OSRM response
+        
+        Args:
+            status_code: HTTP status code of the response
+            data: Decoded JSON body (ignored unless status_code is 200)
+            start_lat: Starting latitude
+            start_lng: Starting longitude
+            end_lat: Ending latitude
+            end_lng: Ending longitude
+        
+        Returns:
+            List of [lat, lng] coordinates, or a straight line if no route was found
+        """
+        if status_code == 200:
+            if data.get('code') == 'Ok' and data.get('routes'):
+                route = data['routes'][0]
+                geometry = route.get('geometry')
+                
+                if geometry and isinstance(geometry, str):
+                    # polyline6 decodes straight to [lat, lng] pairs
+                    return decode_polyline(geometry)
+            
+            # If no route found, return empty list
+            print(f"OSRM returned no route between ({start_lat}, {start_lng}) and ({end_lat}, {end_lng})")
+            return [[start_lat, start_lng], [end_lat, end_lng]]
+        
+        print(f"OSRM request failed with status {status_code}")
+        return [[start_lat, start_lng], [end_lat, end_lng]]
     
     def get_route_coordinates(self, start_lat: float, start_lng: float,
-                             end_lat: float, end_lng: float) -> List[List[float]]:
+                             end_lat: float, end_lng: float, overview: str = DEFAULT_OVERVIEW) -> List[List[float]]:
         """
         Get route coordinates using OSRM (Open Source Routing Machine)
         which uses OSM data for routing
@@ -24,174 +320,216 @@ class EvacuationRoutesService:
             start_lng: Starting longitude
             end_lat: Ending latitude
             end_lng: Ending longitude
-            
+            overview: OSRM geometry detail, 'simplified' or 'full' (exact navigation)
+        
         Returns:
             List of [lat, lng] coordinates following the actual route
         """
         try:
-            # Format coordinates for OSRM: longitude,latitude
-            coords = f"{start_lng},{start_lat};{end_lng},{end_lat}"
-            
-            response = requests.get(
-                f"{self.osrm_url}/{coords}",
-                params={
-                    'overview': 'full',
-                    'geometries': 'geojson',
-                    'steps': 'false',
-                    'alternatives': 'false'
-                },
-                timeout=30
+            response = self.session.get(
+                self._route_url(start_lat, start_lng, end_lat, end_lng),
+                params=self._route_params(overview),
+                timeout=(OSRM_CONNECT_TIMEOUT, OSRM_READ_TIMEOUT)
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('code') == 'Ok' and data.get('routes'):
-                    route = data['routes'][0]
-                    geometry = route.get('geometry')
-                    
-                    if geometry and geometry.get('type') == 'LineString':
-                        # Convert GeoJSON coordinates [lng, lat] to [lat, lng]
-                        coords_list = [[coord[1], coord[0]] for coord in geometry.get('coordinates', [])]
-                        return coords_list
-                
-                # If no route found, return empty list
-                print(f"OSRM returned no route between ({start_lat}, {start_lng}) and ({end_lat}, {end_lng})")
-                return [[start_lat, start_lng], [end_lat, end_lng]]
-            
-            print(f"OSRM request failed with status {response.status_code}")
-            return [[start_lat, start_lng], [end_lat, end_lng]]
-            
+            data = _loads(response.content) if response.status_code == 200 else {}
+            return self._parse_route(response.status_code, data, start_lat, start_lng, end_lat, end_lng)
+        
         except Exception as e:
             print(f"Error fetching route from OSRM: {e}")
             # Return fallback straight line
             return [[start_lat, start_lng], [end_lat, end_lng]]
     
+    async def get_route_coordinates_async(self, client: 'httpx.AsyncClient', start_lat: float, start_lng: float,
+                                          end_lat: float, end_lng: float,
+                                          overview: str = DEFAULT_OVERVIEW) -> List[List[float]]:
+        """
+        Async variant of get_route_coordinates using a shared httpx client
+        
+        Args:
+            client: httpx.AsyncClient used for the request
+            start_lat: Starting latitude
+            start_lng: Starting longitude
+            end_lat: Ending latitude
+            end_lng: Ending longitude
+            overview: OSRM geometry detail, 'simplified' or 'full' (exact navigation)
+        
+        Returns:
+            List of [lat, lng] coordinates following the actual route
+        """
+        try:
+            # httpx only retries failed connections, so retry gateway errors here like the
+            # requests session's urllib3 Retry does
+            for attempt in range(OSRM_RETRIES + 1):
+                response = await client.get(
+                    self._route_url(start_lat, start_lng, end_lat, end_lng),
+                    params=self._route_params(overview),
+                    timeout=httpx.Timeout(OSRM_READ_TIMEOUT, connect=OSRM_CONNECT_TIMEOUT)
+                )
+                if response.status_code not in OSRM_RETRY_STATUSES or attempt == OSRM_RETRIES:
+                    break
+                await asyncio.sleep(OSRM_RETRY_BACKOFF * 2 ** attempt)
+            data = _loads(response.content) if response.status_code == 200 else {}
+            return self._parse_route(response.status_code, data, start_lat, start_lng, end_lat, end_lng)
+        
+        except Exception as e:
+            print(f"Error fetching route from OSRM: {e}")
+            return [[start_lat, start_lng], [end_lat, end_lng]]
+    
+    async def get_all_route_coordinates_async(self, routes_config: List[Dict[str, Any]]) -> List[List[List[float]]]:
+        """
+        Fetch the coordinates of every route concurrently
+        
+        Args:
+            routes_config: Route configurations with 'start' and 'end' [lat, lng] points
+        
+        Returns:
+            Coordinates for each route, in the same order as routes_config
+        """
+        async def fetch(client, config):
+            start_lat, start_lng = config['start']
+            end_lat, end_lng = config['end']
+            try:
+                return await asyncio.wait_for(
+                    self.get_route_coordinates_async(client, start_lat, start_lng, end_lat, end_lng),
+                    ROUTES_FETCH_BUDGET
+                )
+            except asyncio.TimeoutError:
+                print(f"OSRM route for {config['name']} timed out; using a straight line")
+                return [[start_lat, start_lng], [end_lat, end_lng]]
+        
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            retries=OSRM_RETRIES
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await asyncio.gather(*(fetch(client, config) for config in routes_config))
+    
+    def get_all_route_coordinates(self, routes_config: List[Dict[str, Any]]) -> List[List[List[float]]]:
+        """
+        Fetch the coordinates of every route in a thread pool (used when httpx is not installed)
+        
+        Args:
+            routes_config: Route configurations with 'start' and 'end' [lat, lng] points
+        
+        Returns:
+            Coordinates for each route, in the same order as routes_config
+        """
+        executor = ThreadPoolExecutor(max_workers=len(routes_config) or 1)
+        futures = [
+            executor.submit(
+                self.get_route_coordinates,
+                config['start'][0], config['start'][1],
+                config['end'][0], config['end'][1]
+            )
+            for config in routes_config
+        ]
+        wait(futures, timeout=ROUTES_FETCH_BUDGET)
+        # Don't wait for stragglers; they finish (and are discarded) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        all_coords = []
+        for config, future in zip(routes_config, futures):
+            if future.done() and not future.cancelled():
+                all_coords.append(future.result())
+            else:
+                print(f"OSRM route for {config['name']} timed out; using a straight line")
+                all_coords.append([config['start'], config['end']])
+        return all_coords
+    
+    def _config_hash(self) -> str:
+        """Hash of everything the cached geometries depend on (routes, OSRM endpoint and parameters)"""
+        key = json.dumps([ROUTES_CONFIG, self.osrm_url, self._route_params()], sort_keys=True)
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+    
+    def _load_cache(self) -> Optional[Dict[str, Any]]:
+        """Read the route cache file if it matches the current configuration"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cache = _loads(f.read())
+        except (json.JSONDecodeError, FileNotFoundError, IOError, PermissionError):
+            return None
+        if not isinstance(cache, dict) or cache.get('config_hash') != self._config_hash():
+            return None
+        return cache
+    
+    def _save_cache(self, routes: List[Dict[str, Any]], fetched_at: float):
+        """Write the route cache file atomically"""
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps({'config_hash': self._config_hash(), 'fetched_at': fetched_at, 'routes': routes}))
+            os.replace(tmp_file, self.cache_file)
+        except (IOError, PermissionError, OSError) as e:
+            print(f"Warning: Could not write {self.cache_file}: {e}")
+    
+    def _schedule_refresh(self, delay: float):
+        """Refresh the routes from OSRM in a background thread after delay seconds"""
+        with self._lock:
+            if self._refresh_timer is not None and self._refresh_timer.is_alive():
+                return
+            self._refresh_timer = threading.Timer(max(0.0, delay), self._refresh_routes)
+            self._refresh_timer.daemon = True
+            self._refresh_timer.start()
+    
+    def _refresh_routes(self) -> List[Dict[str, Any]]:
+        """Fetch all routes from OSRM; cache them unless some route fell back to a straight line"""
+        routes = self._fetch_all_evacuation_routes()
+        fetched_at = time.time()
+        
+        complete = all(
+            route['coordinates'] != [config['start'], config['end']]
+            for config, route in zip(ROUTES_CONFIG, routes)
+        )
+        if complete:
+            self._save_cache(routes, fetched_at)
+            with self._lock:
+                self._routes = routes
+                self._routes_expire_at = time.monotonic() + self.cache_ttl
+        return routes
+    
     def get_all_evacuation_routes(self) -> List[Dict[str, Any]]:
         """
         Get all evacuation routes for Corpus Christi with actual OSM coordinates
         
+        Geometries are served from memory or the disk cache while they are less than
+        CACHE_TTL_DAYS old; expired caches are served once more while a background
+        refresh runs.
+        
         Returns:
             List of evacuation route dictionaries with accurate coordinates from OSM
         """
-        routes_config = [
-            {
-                'id': 1,
-                'name': 'North Route - I-37',
-                'highway': 'Interstate 37 (I-37)',
-                'description': 'Primary northbound evacuation route via Interstate 37',
-                'nextCity': 'San Antonio',
-                'distance': '150 miles',
-                'color': '#e67e22',
-                'weight': 5,
-                'start': [27.8006, -97.3964],  # Corpus Christi center
-                'end': [29.4241, -98.4936]      # San Antonio
-            },
-            {
-                'id': 2,
-                'name': 'West Route - US-181',
-                'highway': 'US Highway 181',
-                'description': 'Westbound evacuation route via US-181 to Victoria',
-                'nextCity': 'Victoria',
-                'distance': '45 miles',
-                'color': '#3498db',
-                'weight': 5,
-                'start': [27.8006, -97.3964],  # Corpus Christi center
-                'end': [28.8053, -97.0036]     # Victoria
-            },
-            {
-                'id': 3,
-                'name': 'Northwest Route - SH-44',
-                'highway': 'State Highway 44',
-                'description': 'Northwest evacuation route via SH-44',
-                'nextCity': 'Alice',
-                'distance': '35 miles',
-                'color': '#2ecc71',
-                'weight': 5,
-                'start': [27.8006, -97.3964],  # Corpus Christi center
-                'end': [27.7522, -98.0700]     # Alice
-            },
-            {
-                'id': 4,
-                'name': 'South Route - SH-358',
-                'highway': 'State Highway 358 (SPID)',
-                'description': 'South evacuation route via SH-358 (South Padre Island Drive)',
-                'nextCity': 'Padre Island',
-                'distance': '15 miles',
-                'color': '#9b59b6',
-                'weight': 5,
-                'start': [27.7225, -97.3956],  # SPID/I-37 area
-                'end': [27.6150, -97.2200]     # Padre Island area
-            },
-            {
-                'id': 5,
-                'name': 'East Route - SH-358/Portland',
-                'highway': 'SH-358 East to Portland',
-                'description': 'Eastbound evacuation route via SH-358 to Portland and beyond',
-                'nextCity': 'Portland',
-                'distance': '8 miles',
-                'color': '#f39c12',
-                'weight': 5,
-                'start': [27.7225, -97.3956],  # SPID/I-37
-                'end': [27.8774, -97.3187]     # Portland
-            },
-            {
-                'id': 6,
-                'name': 'SH-43 Evacuation Route',
-                'highway': 'State Highway 43',
-                'description': 'Evacuation route via State Highway 43 to Mathis and beyond',
-                'nextCity': 'Mathis',
-                'distance': '30 miles',
-                'color': '#d35400',
-                'weight': 5,
-                'start': [27.8006, -97.3964],  # Corpus Christi center (SH-43 begins here)
-                'end': [28.0936, -97.8281]     # Mathis (SH-43 continues north)
-            },
-            {
-                'id': 7,
-                'name': 'Coastal Route - SH-357',
-                'highway': 'State Highway 357',
-                'description': 'Coastal evacuation route via SH-357 along the bay',
-                'nextCity': 'Port Aransas',
-                'distance': '25 miles',
-                'color': '#16a085',
-                'weight': 4,
-                'start': [27.8006, -97.3964],  # Corpus Christi center
-                'end': [27.8339, -97.0614]     # Port Aransas area
-            },
-            {
-                'id': 8,
-                'name': 'SH-43 / FM 2444 Route',
-                'highway': 'State Highway 43 / FM 2444',
-                'description': 'North evacuation route via SH-43 and FM 2444',
-                'nextCity': 'Beeville',
-                'distance': '40 miles',
-                'color': '#8e44ad',
-                'weight': 5,
-                'start': [27.8006, -97.3964],  # Corpus Christi center (SH-43 begins)
-                'end': [28.4009, -97.7481]     # Beeville area (via FM 2444)
-            },
-            {
-                'id': 9,
-                'name': 'South Staples St to FM 2444',
-                'highway': 'Staples Street / FM 2444',
-                'description': 'North evacuation route from South Staples Street to FM 2444',
-                'nextCity': 'Beeville',
-                'distance': '45 miles',
-                'color': '#1abc9c',
-                'weight': 5,
-                'start': [27.7089, -97.3934],  # SPID at Staples Street (South Staples Street intersection)
-                'end': [28.4009, -97.7481]     # FM 2444 / Beeville area
-            }
-        ]
+        with self._lock:
+            if self._routes is not None and time.monotonic() < self._routes_expire_at:
+                return self._routes
+        
+        cache = self._load_cache()
+        if cache is not None:
+            age = time.time() - cache.get('fetched_at', 0)
+            routes = cache['routes']
+            with self._lock:
+                self._routes = routes
+                self._routes_expire_at = time.monotonic() + max(0.0, self.cache_ttl - age)
+            self._schedule_refresh(self.cache_ttl - age)
+            return routes
+        
+        return self._refresh_routes()
+    
+    def _fetch_all_evacuation_routes(self) -> List[Dict[str, Any]]:
+        """
+        Fetch all evacuation routes from OSRM
+        
+        Returns:
+            List of evacuation route dictionaries with accurate coordinates from OSM
+        """
+        # Get actual route coordinates from OSM via OSRM (all routes at once)
+        if HTTPX_AVAILABLE:
+            all_coords = asyncio.run(self.get_all_route_coordinates_async(ROUTES_CONFIG))
+        else:
+            all_coords = self.get_all_route_coordinates(ROUTES_CONFIG)
         
         routes = []
-        for config in routes_config:
-            # Get actual route coordinates from OSM via OSRM
-            coords = self.get_route_coordinates(
-                config['start'][0], config['start'][1],
-                config['end'][0], config['end'][1]
-            )
-            
+        for config, coords in zip(ROUTES_CONFIG, all_coords):
             route = {
                 'id': config['id'],
                 'name': config['name'],
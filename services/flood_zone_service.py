@@ -3,15 +3,79 @@ Flood Zone Service
 Handles flood zone overlay storage and retrieval using JSON file
 """
 
+import atexit
+import copy
+import functools
 import json
 import os
+import threading
 from typing import List, Dict, Any, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Zones are written as compact JSON in a single write; set FLOOD_ZONES_PRETTY_JSON=1
+# to keep the file indented for hand editing
+PRETTY_JSON = os.getenv('FLOOD_ZONES_PRETTY_JSON', '').lower() in ('1', 'true', 'yes')
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Encode obj as UTF-8 JSON bytes, compact or indented by 2 (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _loads(data: bytes) -> Any:
+    """Decode JSON bytes (orjson when available)"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+# Seconds after the first unsaved change before zones are written, so a burst of
+# edits costs one file write
+FLUSH_DELAY = 0.25
+
+# Default bounds for Corpus Christi area
+# Images are 2550x1815 (aspect ratio 1.405), so adjust longitude range
+# to match image aspect ratio
+# Lat range: 0.2 (27.7 to 27.9), so lng range should be 0.2 * 1.405 = 0.281
+# Center around -97.4, so west = -97.4 - 0.1405 = -97.5405, east = -97.4 + 0.1405 = -97.2595
+CORPUS_CHRISTI_BOUNDS = ((27.7, -97.540496), (27.9, -97.259504))
+
+# Default zone definitions matching the HTML checkboxes; copied when first written
+DEFAULT_ZONES = tuple(
+    {
+        "id": zone_id,
+        "name": name,
+        "image_path": f"mapzone/{name}zone.png",
+        "bounds": [list(point) for point in CORPUS_CHRISTI_BOUNDS],
+        "opacity": 0.6,
+        "scale": 1.0,
+        "rotation": 0
+    }
+    for zone_id, name in enumerate(('green', 'orange', 'pink', 'purple', 'yellow'), start=1)
+)
+
 class FloodZoneService:
     def __init__(self, db_file: str = 'flood_zones.json'):
         self.db_file = db_file
         self._in_memory = False
         self._memory_storage = []  # Fallback in-memory storage
+        # Parsed zones and the (mtime, size) of the file they were read from
+        self._cache = None
+        self._cache_stat = None
+        # Changes are applied to the cache and written by a delayed flush
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._flush_timer = None
+        # Zone and list position by id, for the list object in _indexed
+        self._by_id = {}
+        self._index_of = {}
+        self._indexed = None
+        self._max_id = 0  # Highest zone id, so new zones get max(id) + 1 as before
+        atexit.register(self.flush)
         self._ensure_db_file()
         self._initialize_default_zones_if_empty()
     
@@ -27,94 +91,112 @@ class FloodZoneService:
             print(f"Warning: Could not create {self.db_file}: {e}. Using in-memory storage.")
             self._in_memory = True
     
+    def _has_zones(self) -> bool:
+        """Whether any zones are stored, checked from the file size and first bytes when possible"""
+        if self._in_memory:
+            return bool(self._memory_storage)
+        try:
+            if os.path.getsize(self.db_file) <= 2:
+                return False  # Missing zones or '[]'
+            with open(self.db_file, 'rb') as f:
+                head = f.read(64).lstrip()
+        except OSError:
+            return False
+        if head.startswith(b'[') and head[1:].lstrip().startswith(b'{'):
+            return True  # A list starting with a zone object
+        # Whitespace, '[ ]', or anything unusual: parse to be sure
+        return len(self._load_zones()) > 0
+    
     def _initialize_default_zones_if_empty(self):
         """Initialize default flood zones if the database is empty"""
-        zones = self._load_zones()
-        
-        if len(zones) == 0:
-            # Default bounds for Corpus Christi area
-            # Images are 2550x1815 (aspect ratio 1.405), so adjust longitude range
-            # to match image aspect ratio
-            # Lat range: 0.2 (27.7 to 27.9), so lng range should be 0.2 * 1.405 = 0.281
-            # Center around -97.4, so west = -97.4 - 0.1405 = -97.5405, east = -97.4 + 0.1405 = -97.2595
-            corpus_christi_bounds = [[27.7, -97.540496], [27.9, -97.259504]]
-            
-            # Default zone definitions matching the HTML checkboxes
-            default_zones = [
-                {
-                    "id": 1,
-                    "name": "green",
-                    "image_path": "mapzone/greenzone.png",
-                    "bounds": corpus_christi_bounds,
-                    "opacity": 0.6,
-                    "scale": 1.0,
-                    "rotation": 0
-                },
-                {
-                    "id": 2,
-                    "name": "orange",
-                    "image_path": "mapzone/orangezone.png",
-                    "bounds": corpus_christi_bounds,
-                    "opacity": 0.6,
-                    "scale": 1.0,
-                    "rotation": 0
-                },
-                {
-                    "id": 3,
-                    "name": "pink",
-                    "image_path": "mapzone/pinkzone.png",
-                    "bounds": corpus_christi_bounds,
-                    "opacity": 0.6,
-                    "scale": 1.0,
-                    "rotation": 0
-                },
-                {
-                    "id": 4,
-                    "name": "purple",
-                    "image_path": "mapzone/purplezone.png",
-                    "bounds": corpus_christi_bounds,
-                    "opacity": 0.6,
-                    "scale": 1.0,
-                    "rotation": 0
-                },
-                {
-                    "id": 5,
-                    "name": "yellow",
-                    "image_path": "mapzone/yellowzone.png",
-                    "bounds": corpus_christi_bounds,
-                    "opacity": 0.6,
-                    "scale": 1.0,
-                    "rotation": 0
-                }
-            ]
-            
+        if not self._has_zones():
+            default_zones = copy.deepcopy(list(DEFAULT_ZONES))
             self._save_zones(default_zones)
             print(f"Initialized {len(default_zones)} default flood zones")
     
-    def _load_zones(self) -> List[Dict[str, Any]]:
-        """Load all flood zones from JSON file"""
-        if self._in_memory:
-            return self._memory_storage
+    def _file_stat(self) -> Optional[tuple]:
+        """(mtime_ns, size) of the JSON file, or None if it can't be read"""
         try:
-            with open(self.db_file, 'r') as f:
-                zones = json.load(f)
-                return zones if isinstance(zones, list) else []
-        except (json.JSONDecodeError, FileNotFoundError, IOError, PermissionError):
-            return []
+            stat = os.stat(self.db_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _load_zones(self) -> List[Dict[str, Any]]:
+        """Load all flood zones, re-reading the JSON file only when it has changed"""
+        with self._lock:
+            if self._in_memory:
+                return self._memory_storage
+            
+            # Unsaved changes take precedence over the file
+            file_stat = self._file_stat()
+            if self._cache is not None and (self._dirty or file_stat == self._cache_stat):
+                return self._cache
+            
+            try:
+                with open(self.db_file, 'rb') as f:
+                    zones = _loads(f.read())
+                    zones = zones if isinstance(zones, list) else []
+            except (json.JSONDecodeError, UnicodeDecodeError, FileNotFoundError, IOError, PermissionError):
+                return []
+            
+            self._cache = zones
+            self._cache_stat = file_stat
+            return zones
     
     def _save_zones(self, zones: List[Dict[str, Any]]):
-        """Save flood zones to JSON file"""
-        if self._in_memory:
-            self._memory_storage = zones
-            return
-        try:
-            with open(self.db_file, 'w') as f:
-                json.dump(zones, f, indent=2)
-        except (IOError, PermissionError, OSError) as e:
-            # In serverless environments, file writes may fail - use in-memory storage
-            print(f"Warning: Could not save to {self.db_file}: {e}. Using in-memory storage.")
-            self._in_memory = True
-            self._memory_storage = zones
+        """Store flood zones and schedule writing them to the JSON file"""
+        with self._lock:
+            if self._in_memory:
+                self._memory_storage = zones
+                return
+            
+            self._cache = zones
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self):
+        """Write unsaved zones to the JSON file (atomically, via a temporary file)"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty or self._in_memory:
+                return
+            
+            zones = self._cache
+            tmp_file = f"{self.db_file}.tmp"
+            try:
+                # One buffered write instead of json.dump's write per token
+                with open(tmp_file, 'wb') as f:
+                    f.write(_dumps(zones, pretty=PRETTY_JSON))
+                os.replace(tmp_file, self.db_file)
+                self._cache_stat = self._file_stat()
+            except (IOError, PermissionError, OSError) as e:
+                # In serverless environments, file writes may fail - use in-memory storage
+                print(f"Warning: Could not save to {self.db_file}: {e}. Using in-memory storage.")
+                self._in_memory = True
+                self._memory_storage = zones
+            self._dirty = False
+    
+    def _indexed_zones(self) -> List[Dict[str, Any]]:
+        """Load zones, rebuilding the id index if the list was (re)loaded"""
+        with self._lock:
+            zones = self._load_zones()
+            if zones is not self._indexed:
+                self._by_id = {}
+                self._index_of = {}
+                for i, zone in enumerate(zones):
+                    # First zone wins for duplicate ids, as with a linear scan
+                    if zone.get('id') not in self._by_id:
+                        self._by_id[zone.get('id')] = zone
+                        self._index_of[zone.get('id')] = i
+                self._max_id = max((z.get('id', 0) for z in zones), default=0)
+                self._indexed = zones
+            return zones
     
     def create_zone(self, zone_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -130,34 +212,37 @@ class FloodZoneService:
         Returns:
             Created zone dictionary with id
         """
-        zones = self._load_zones()
-        
-        # Generate ID
-        max_id = max([z.get('id', 0) for z in zones], default=0)
-        zone_id = max_id + 1
-        
-        # Add ID to zone data
-        zone_data['id'] = zone_id
-        
-        # Add to zones list
-        zones.append(zone_data)
-        
-        # Save to file
-        self._save_zones(zones)
-        
-        return zone_data
+        with self._lock:
+            zones = self._indexed_zones()
+            
+            # Generate ID
+            zone_id = self._max_id + 1
+            self._max_id = zone_id
+            
+            # Add ID to zone data
+            zone_data['id'] = zone_id
+            
+            # Add to zones list
+            zones.append(zone_data)
+            self._by_id[zone_id] = zone_data
+            self._index_of[zone_id] = len(zones) - 1
+            
+            # Save (written to the file by the delayed flush)
+            self._save_zones(zones)
+            
+            return zone_data
     
     def get_all_zones(self) -> List[Dict[str, Any]]:
-        """Get all flood zones"""
-        return self._load_zones()
+        """Get all flood zones (shallow copies, so callers may modify them without touching the cache)"""
+        with self._lock:
+            return [dict(zone) for zone in self._load_zones()]
     
     def get_zone_by_id(self, zone_id: int) -> Optional[Dict[str, Any]]:
-        """Get a specific zone by ID"""
-        zones = self._load_zones()
-        for zone in zones:
-            if zone.get('id') == zone_id:
-                return zone
-        return None
+        """Get a specific zone by ID (a shallow copy, as with get_all_zones)"""
+        with self._lock:
+            self._indexed_zones()
+            zone = self._by_id.get(zone_id)
+            return dict(zone) if zone is not None else None
     
     def update_zone(self, zone_id: int, zone_data: Dict[str, Any]) -> bool:
         """
@@ -166,17 +251,19 @@ class FloodZoneService:
         Returns:
             True if updated, False if not found
         """
-        zones = self._load_zones()
-        
-        for i, zone in enumerate(zones):
-            if zone.get('id') == zone_id:
-                # Update zone data but keep the ID
-                zone_data['id'] = zone_id
-                zones[i] = zone_data
-                self._save_zones(zones)
-                return True
-        
-        return False
+        with self._lock:
+            zones = self._indexed_zones()
+            
+            i = self._index_of.get(zone_id)
+            if i is None:
+                return False
+            
+            # Update zone data but keep the ID
+            zone_data['id'] = zone_id
+            zones[i] = zone_data
+            self._by_id[zone_id] = zone_data
+            self._save_zones(zones)
+            return True
     
     def delete_zone(self, zone_id: int) -> bool:
         """
@@ -185,14 +272,26 @@ class FloodZoneService:
         Returns:
             True if deleted, False if not found
         """
-        zones = self._load_zones()
-        initial_count = len(zones)
-        
-        zones = [z for z in zones if z.get('id') != zone_id]
-        
-        if len(zones) < initial_count:
+        with self._lock:
+            zones = self._indexed_zones()
+            
+            i = self._index_of.pop(zone_id, None)
+            if i is None:
+                return False
+            
+            del self._by_id[zone_id]
+            zones.pop(i)
+            # Zones after the removed one moved up a slot
+            for j in range(i, len(zones)):
+                if self._by_id.get(zones[j].get('id')) is zones[j]:
+                    self._index_of[zones[j].get('id')] = j
+            if zone_id == self._max_id:
+                self._max_id = max((z.get('id', 0) for z in zones), default=0)
             self._save_zones(zones)
             return True
-        
-        return False
+
+@functools.lru_cache(maxsize=None)
+def get_flood_zone_service(db_file: str = 'flood_zones.json') -> FloodZoneService:
+    """Shared FloodZoneService for db_file, created on first use"""
+    return FloodZoneService(db_file)
 
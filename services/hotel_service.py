@@ -3,10 +3,48 @@ Hotel Service for Corpus Christi Hurricane Evacuation
 Provides hotel search functionality focused on Texas cities surrounding Corpus Christi.
 """
 
+import functools
+import operator
+import random
 import urllib.parse
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 
+# Seed for the sample hotel catalog, so every search sees the same hotels and prices
+HOTEL_SAMPLE_SEED = 0
+
+# Distance estimates (miles) from Corpus Christi, by city name
+DISTANCES = {
+    'Brownsville': 120, 'San Antonio': 140, 'Laredo': 150, 'McAllen': 150,
+    'Houston': 200, 'Austin': 200, 'Pasadena': 200, 'Killeen': 200,
+    'Round Rock': 200, 'College Station': 200, 'Beaumont': 250, 'Waco': 250,
+    'Abilene': 300, 'Tyler': 300, 'Dallas': 350, 'Plano': 350,
+    'Lubbock': 350, 'Garland': 350, 'Irving': 350, 'McKinney': 350,
+    'Frisco': 350, 'Carrollton': 350, 'Richardson': 350, 'Lewisville': 350,
+    'Fort Worth': 370, 'Arlington': 370, 'Grand Prairie': 370, 'Midland': 400,
+    'Odessa': 400, 'Amarillo': 550, 'El Paso': 650
+}
+
+# Distance used for cities missing from DISTANCES
+DEFAULT_CITY_DISTANCE = 500
+
+# Pre-defined hotel chains with properties
+HOTEL_TEMPLATES = [
+    {'name': 'Holiday Inn Express', 'base_price': 109.99, 'pet_friendly': True, 'rating': 4.2, 'has_food': True},
+    {'name': 'Hampton Inn', 'base_price': 119.99, 'pet_friendly': True, 'rating': 4.3, 'has_food': True},
+    {'name': 'Best Western', 'base_price': 99.99, 'pet_friendly': True, 'rating': 4.1, 'has_food': True},
+    {'name': 'La Quinta', 'base_price': 94.99, 'pet_friendly': True, 'rating': 4.0, 'has_food': True},
+    {'name': 'Comfort Inn', 'base_price': 89.99, 'pet_friendly': True, 'rating': 4.0, 'has_food': True},
+    {'name': 'Days Inn', 'base_price': 69.99, 'pet_friendly': False, 'rating': 3.7, 'has_food': False},
+    {'name': 'Motel 6', 'base_price': 54.99, 'pet_friendly': True, 'rating': 3.4, 'has_food': False},
+    {'name': 'Super 8', 'base_price': 64.99, 'pet_friendly': False, 'rating': 3.6, 'has_food': False},
+    {'name': 'Ramada', 'base_price': 104.99, 'pet_friendly': True, 'rating': 4.1, 'has_food': True},
+    {'name': 'Quality Inn', 'base_price': 79.99, 'pet_friendly': True, 'rating': 3.9, 'has_food': True},
+]
+
+# URL-quoted chain names; a hotel's quoted name is chain + ' - ' + city, each quoted once
+QUOTED_CHAIN_NAMES = {template['name']: urllib.parse.quote(template['name']) for template in HOTEL_TEMPLATES}
+
 
 class HotelService:
     """Service for managing hotel searches and data"""
@@ -26,6 +64,17 @@ class HotelService:
             "Beaumont, TX", "Round Rock, TX", "Odessa, TX", "Waco, TX",
             "Richardson, TX", "Lewisville, TX", "Tyler, TX", "College Station, TX"
         ]
+        
+        # Distance per city, and (city, distance) pairs sorted closest first
+        self._city_distance = {
+            city: DISTANCES.get(city.replace(', TX', '').strip(), DEFAULT_CITY_DISTANCE)
+            for city in self.texas_cities
+        }
+        self._cities_sorted_by_distance = sorted(self._city_distance.items(), key=lambda x: x[1])
+        self._quoted_cities = {city: urllib.parse.quote(city.replace(', TX', '')) for city in self.texas_cities}
+        
+        # The sample catalog is deterministic for a seed, so it is generated once
+        self._hotel_samples = functools.lru_cache(maxsize=1)(self._build_texas_hotel_samples)
     
     def search_texas_hotels(self) -> Dict:
         """Search for hotels in Texas cities surrounding Corpus Christi - SIMPLIFIED VERSION"""
@@ -48,54 +97,17 @@ class HotelService:
         }
     
     def _generate_texas_hotel_samples(self) -> List[Dict]:
+        """Sample hotel data for Texas cities (a new list, so callers may reorder it freely)"""
+        return list(self._hotel_samples(HOTEL_SAMPLE_SEED))
+    
+    def _build_texas_hotel_samples(self, seed: int) -> Tuple[Dict, ...]:
         """Generate sample hotel data for Texas cities - PRIORITIZING CLOSEST CITIES"""
         hotels = []
-        
-        # Distance estimates from Corpus Christi - sorted by distance (closest first)
-        distances = {
-            'Brownsville': 120, 'San Antonio': 140, 'Laredo': 150, 'McAllen': 150,
-            'Houston': 200, 'Austin': 200, 'Pasadena': 200, 'Killeen': 200,
-            'Round Rock': 200, 'College Station': 200, 'Beaumont': 250, 'Waco': 250,
-            'Abilene': 300, 'Tyler': 300, 'Dallas': 350, 'Plano': 350,
-            'Lubbock': 350, 'Garland': 350, 'Irving': 350, 'McKinney': 350,
-            'Frisco': 350, 'Carrollton': 350, 'Richardson': 350, 'Lewisville': 350,
-            'Fort Worth': 370, 'Arlington': 370, 'Grand Prairie': 370, 'Midland': 400,
-            'Odessa': 400, 'Amarillo': 550, 'El Paso': 650
-        }
-        
-        # Pre-defined hotel chains with properties
-        hotel_templates = [
-            {'name': 'Holiday Inn Express', 'base_price': 109.99, 'pet_friendly': True, 'rating': 4.2, 'has_food': True},
-            {'name': 'Hampton Inn', 'base_price': 119.99, 'pet_friendly': True, 'rating': 4.3, 'has_food': True},
-            {'name': 'Best Western', 'base_price': 99.99, 'pet_friendly': True, 'rating': 4.1, 'has_food': True},
-            {'name': 'La Quinta', 'base_price': 94.99, 'pet_friendly': True, 'rating': 4.0, 'has_food': True},
-            {'name': 'Comfort Inn', 'base_price': 89.99, 'pet_friendly': True, 'rating': 4.0, 'has_food': True},
-            {'name': 'Days Inn', 'base_price': 69.99, 'pet_friendly': False, 'rating': 3.7, 'has_food': False},
-            {'name': 'Motel 6', 'base_price': 54.99, 'pet_friendly': True, 'rating': 3.4, 'has_food': False},
-            {'name': 'Super 8', 'base_price': 64.99, 'pet_friendly': False, 'rating': 3.6, 'has_food': False},
-            {'name': 'Ramada', 'base_price': 104.99, 'pet_friendly': True, 'rating': 4.1, 'has_food': True},
-            {'name': 'Quality Inn', 'base_price': 79.99, 'pet_friendly': True, 'rating': 3.9, 'has_food': True},
-        ]
-        
-        import random
-        
-        # Sort cities by distance (closest first) for priority generation
-        city_distances = []
-        for city in self.texas_cities:
-            distance = 500  # default for far cities
-            city_name = city.replace(', TX', '').strip()
-            for city_key, dist in distances.items():
-                if city_key in city_name or city_name in city_key:
-                    distance = dist
-                    break
-            city_distances.append((city, distance))
-        
-        # Sort by distance (closest first)
-        city_distances.sort(key=lambda x: x[1])
+        rng = random.Random(seed)
         
         # Generate hotels for closest cities first - prioritize cities within 250 miles
         # Generate more hotels for closer cities to ensure they appear in top results
-        for city, distance in city_distances:
+        for city, distance in self._cities_sorted_by_distance:
             # Prioritize closest cities (within 150 miles) with 4 hotels each
             # Cities 150-250 miles get 3 hotels, farther cities get 2 hotels
             if distance <= 150:
@@ -106,15 +118,16 @@ class HotelService:
                 num_hotels = 2  # Standard for farther cities
             
             # Pick random hotels for this city
-            selected_hotels = random.sample(hotel_templates, min(num_hotels, len(hotel_templates)))
+            selected_hotels = rng.sample(HOTEL_TEMPLATES, min(num_hotels, len(HOTEL_TEMPLATES)))
             
             for template in selected_hotels:
                 # Add price variation
-                price_variation = random.uniform(-10, 20)
+                price_variation = rng.uniform(-10, 20)
                 final_price = round(max(45, template['base_price'] + price_variation), 2)
                 
                 # Create hotel entry
                 hotel_name = f"{template['name']} - {city.replace(', TX', '')}"
+                quoted_name = f"{QUOTED_CHAIN_NAMES[template['name']]}%20-%20{self._quoted_cities[city]}"
                 hotel = {
                     'name': hotel_name,
                     'price': final_price,
@@ -128,30 +141,36 @@ class HotelService:
                     'vacancy': True,
                     'rating': template['rating'],
                     'source': 'Sample Data - Call hotel for real-time availability',
-                    'url': f'https://www.google.com/search?q={urllib.parse.quote(hotel_name)}+hotel+booking',
-                    'booking_url': f'https://www.booking.com/searchresults.html?ss={urllib.parse.quote(hotel_name)}'
+                    'url': f'https://www.google.com/search?q={quoted_name}+hotel+booking',
+                    'booking_url': f'https://www.booking.com/searchresults.html?ss={quoted_name}'
                 }
                 hotels.append(hotel)
         
+        # Store in the default display order (cheapest, then closest) so sorting for the
+        # default filters is a single linear pass over an already ordered run
+        hotels.sort(key=operator.itemgetter('price', 'distance_miles'))
+        
         # GUARANTEE at least 30+ hotels with closer cities prioritized
-        return hotels
+        return tuple(hotels)
     
     def filter_and_sort_hotels(self, hotels: List[Dict], filters: Dict) -> List[Dict]:
         """Filter and sort hotels based on user criteria"""
         if not hotels:
             return []
         
-        filtered = list(hotels)  # Copy list
-        
-        # Apply filters
+        # Apply all active filters in a single pass: (field, default when missing)
+        checks = []
         if filters.get('pet_friendly'):
-            filtered = [h for h in filtered if h.get('pet_friendly', False)]
-        
+            checks.append(('pet_friendly', False))
         if filters.get('has_food'):
-            filtered = [h for h in filtered if h.get('has_food', False)]
-        
+            checks.append(('has_food', False))
         if filters.get('vacancy'):
-            filtered = [h for h in filtered if h.get('vacancy', True)]
+            checks.append(('vacancy', True))
+        
+        if checks:
+            filtered = [h for h in hotels if all(h.get(field, default) for field, default in checks)]
+        else:
+            filtered = list(hotels)  # Copy list
         
         # GUARANTEE at least one result even if filters remove all
         if len(filtered) == 0 and len(hotels) > 0:
@@ -164,25 +183,27 @@ class HotelService:
         # Determine distance sort direction (closest first is default for safety)
         distance_reverse = distance_sort_option == 'furthest_closest'
         
+        # Catalog hotels always carry a rounded float price and float distance_miles, so
+        # the keys are read with itemgetter (in C). Mixed directions use two stable sorts:
+        # secondary key first, then primary.
         if sort_option == 'price_low_high':
             # Primary: Price low to high (cheapest first), Secondary: Distance (closest first for evacuation safety)
             # This ensures cheapest hotels show first, and within same price, closest hotels are prioritized
-            filtered = sorted(filtered, key=lambda x: (
-                round(float(x.get('price', float('inf'))), 2),  # Primary: cheapest first (rounded to avoid float precision issues)
-                float(x.get('distance_miles', float('inf'))) if not distance_reverse else -float(x.get('distance_miles', float('inf')))  # Secondary: closest first
-            ))
+            if distance_reverse:
+                filtered.sort(key=operator.itemgetter('distance_miles'), reverse=True)
+                filtered.sort(key=operator.itemgetter('price'))
+            else:
+                filtered.sort(key=operator.itemgetter('price', 'distance_miles'))
         elif sort_option == 'price_high_low':
             # Primary: Price high to low, Secondary: Distance
-            filtered = sorted(filtered, key=lambda x: (
-                -x.get('price', 0),  # Primary: most expensive first
-                x.get('distance_miles', float('inf')) if not distance_reverse else -float(x.get('distance_miles', float('inf')))  # Secondary: closest first
-            ))
+            if distance_reverse:
+                filtered.sort(key=operator.itemgetter('price', 'distance_miles'), reverse=True)
+            else:
+                filtered.sort(key=operator.itemgetter('distance_miles'))
+                filtered.sort(key=operator.itemgetter('price'), reverse=True)
         else:
             # No price sort specified, just sort by distance
-            filtered = sorted(filtered, 
-                key=lambda x: x.get('distance_miles', float('inf')),
-                reverse=distance_reverse
-            )
+            filtered.sort(key=operator.itemgetter('distance_miles'), reverse=distance_reverse)
         
         return filtered
 
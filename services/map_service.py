@@ -4,8 +4,67 @@ Expandable to support multiple map providers (Google Maps, Mapbox, Nominatim, et
 """
 
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Hashable, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+
+# Geocoding results cache: size, lifetime of found results, and of not-found results
+GEOCODE_CACHE_SIZE = 1024
+GEOCODE_CACHE_TTL = 24 * 3600
+NOT_FOUND_CACHE_TTL = 300
+
+# Errors meaning the provider has no result (cached briefly); other errors are not cached
+NOT_FOUND_ERRORS = ('Address not found', 'Reverse geocoding failed')
+
+# Reverse geocoding coordinates are rounded to this many decimal places (~11 m) so nearby
+# points share a cache entry
+REVERSE_GEOCODE_PRECISION = 4
+
+class GeocodeCache:
+    """
+    Thread-safe LRU cache of geocoding results with per-entry time-to-live.
+    
+    Expired entries that carry an ETag are kept (until evicted) so they can be
+    revalidated with a conditional request instead of fetched again.
+    """
+    
+    def __init__(self, maxsize: int = GEOCODE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._store = OrderedDict()  # key -> (expires_at, result, etag)
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            expires_at, result, etag = entry
+            if expires_at < time.monotonic():
+                if etag is None:
+                    del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return result
+    
+    def get_stale(self, key: Hashable) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return (result, etag) of an expired entry that can be revalidated, or None"""
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None or entry[2] is None:
+                return None
+            return entry[1], entry[2]
+    
+    def set(self, key: Hashable, result: Dict[str, Any], ttl: float, etag: Optional[str] = None):
+        """Store result under key for ttl seconds, evicting the least recently used entry when full"""
+        with self._lock:
+            self._store[key] = (time.monotonic() + ttl, result, etag)
+            self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
 
 class MapService:
     """Service for handling map and geocoding operations"""
@@ -15,6 +74,60 @@ class MapService:
         self.api_key = os.getenv('MAP_API_KEY', '')
         self.provider = os.getenv('MAP_PROVIDER', 'nominatim')  # Default to free Nominatim
         
+        # Keep-alive connection pool for Nominatim requests
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self.session.headers.update({
+            'User-Agent': 'FlaskMapApp/1.0',  # Required by Nominatim
+            'Accept-Encoding': 'gzip, deflate'
+        })
+        
+        self.cache = GeocodeCache()
+    
+    def _cached(self, key: Hashable, lookup: Callable[[Optional[str]], Tuple[Optional[Dict[str, Any]], Optional[str]]]) -> Dict[str, Any]:
+        """
+        Return the cached result for key, calling lookup on a miss.
+        
+        Args:
+            key: Cache key
+            lookup: Provider call taking the ETag of an expired entry (or None) and returning
+                (result, etag); result is None when the provider reports Not Modified
+        
+        Returns:
+            A copy of the result, so callers may modify it
+        """
+        result = self.cache.get(key)
+        if result is None:
+            stale = self.cache.get_stale(key)
+            result, etag = lookup(stale[1] if stale else None)
+            if result is None:
+                # 304 Not Modified: the expired result is still current
+                result = stale[0]
+            if 'error' not in result:
+                self.cache.set(key, result, GEOCODE_CACHE_TTL, etag)
+            elif result['error'] in NOT_FOUND_ERRORS:
+                self.cache.set(key, result, NOT_FOUND_CACHE_TTL, etag)
+        return dict(result)
+    
+    def _nominatim_get(self, url: str, params: Dict[str, Any], etag: Optional[str]) -> Tuple[Any, Optional[str]]:
+        """
+        GET a Nominatim endpoint, conditionally when an ETag is known.
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            etag: ETag of the cached response, or None
+        
+        Returns:
+            Tuple of (decoded JSON, response ETag); the JSON is None if the response was 304
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        response = self.session.get(url, params=params, headers=headers, timeout=5)
+        if etag and response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+        return response.json(), response.headers.get('ETag')
+    
     def geocode_address(self, address: str) -> Dict[str, Any]:
         """
         Geocode an address to coordinates.
@@ -27,7 +140,7 @@ class MapService:
         """
         if not self.api_key and self.provider == 'nominatim':
             # Use free Nominatim service (OpenStreetMap)
-            return self._geocode_nominatim(address)
+            return self._cached(('search', address), lambda etag: self._geocode_nominatim(address, etag))
         
         # TODO: Implement other providers (Google Maps, Mapbox, etc.)
         # if self.provider == 'google':
@@ -35,7 +148,7 @@ class MapService:
         # elif self.provider == 'mapbox':
         #     return self._geocode_mapbox(address)
         
-        return self._geocode_nominatim(address)
+        return self._cached(('search', address), lambda etag: self._geocode_nominatim(address, etag))
     
     def reverse_geocode(self, lat: float, lng: float) -> Dict[str, Any]:
         """
@@ -48,14 +161,23 @@ class MapService:
         Returns:
             Dictionary with address information
         """
+        # Look up the rounded point, but report the coordinates that were asked for
+        rounded_lat = round(lat, REVERSE_GEOCODE_PRECISION)
+        rounded_lng = round(lng, REVERSE_GEOCODE_PRECISION)
+        key = ('reverse', rounded_lat, rounded_lng)
+        
         if not self.api_key and self.provider == 'nominatim':
-            return self._reverse_geocode_nominatim(lat, lng)
+            result = self._cached(key, lambda etag: self._reverse_geocode_nominatim(rounded_lat, rounded_lng, etag))
+        else:
+            # TODO: Implement other providers
+            result = self._cached(key, lambda etag: self._reverse_geocode_nominatim(rounded_lat, rounded_lng, etag))
         
-        # TODO: Implement other providers
-        return self._reverse_geocode_nominatim(lat, lng)
+        result['lat'] = lat
+        result['lng'] = lng
+        return result
     
-    def _geocode_nominatim(self, address: str) -> Dict[str, Any]:
-        """Geocode using Nominatim (free, no API key required)"""
+    def _geocode_nominatim(self, address: str, etag: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Geocode using Nominatim (free, no API key required); returns (result, etag), see _cached"""
         try:
             url = "https://nominatim.openstreetmap.org/search"
             params = {
@@ -63,14 +185,10 @@ class MapService:
                 'format': 'json',
                 'limit': 1
             }
-            headers = {
-                'User-Agent': 'FlaskMapApp/1.0'  # Required by Nominatim
-            }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=5)
-            response.raise_for_status()
             
-            data = response.json()
+            data, etag = self._nominatim_get(url, params, etag)
+            if data is None:
+                return None, etag
             
             if data and len(data) > 0:
                 result = data[0]
@@ -79,20 +197,20 @@ class MapService:
                     'lng': float(result['lon']),
                     'display_name': result.get('display_name', address),
                     'address': address
-                }
+                }, etag
             else:
                 return {
                     'error': 'Address not found',
                     'address': address
-                }
+                }, etag
         except Exception as e:
             return {
                 'error': str(e),
                 'address': address
-            }
+            }, None
     
-    def _reverse_geocode_nominatim(self, lat: float, lng: float) -> Dict[str, Any]:
-        """Reverse geocode using Nominatim"""
+    def _reverse_geocode_nominatim(self, lat: float, lng: float, etag: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Reverse geocode using Nominatim; returns (result, etag), see _cached"""
         try:
             url = "https://nominatim.openstreetmap.org/reverse"
             params = {
@@ -100,14 +218,10 @@ class MapService:
                 'lon': lng,
                 'format': 'json'
             }
-            headers = {
-                'User-Agent': 'FlaskMapApp/1.0'
-            }
             
-            response = requests.get(url, params=params, headers=headers, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
+            data, etag = self._nominatim_get(url, params, etag)
+            if data is None:
+                return None, etag
             
             if 'address' in data:
                 return {
@@ -115,17 +229,17 @@ class MapService:
                     'components': data.get('address', {}),
                     'lat': lat,
                     'lng': lng
-                }
+                }, etag
             else:
                 return {
                     'error': 'Reverse geocoding failed',
                     'lat': lat,
                     'lng': lng
-                }
+                }, etag
         except Exception as e:
             return {
                 'error': str(e),
                 'lat': lat,
                 'lng': lng
-            }
+            }, None
 
@@ -3,7 +3,9 @@ Prompt Sandbox Service
 Validates and sanitizes prompts to prevent red teaming and prompt injection attacks
 """
 
+import json
 import re
+from functools import lru_cache
 from typing import Dict, Any, Optional, Tuple
 
 class PromptSandbox:
@@ -40,11 +42,46 @@ class PromptSandbox:
         'new instructions', 'override', 'override system',
     ]
     
+    # Entries kept in each of the validation result caches
+    VALIDATION_CACHE_SIZE = 512
+    
     def __init__(self):
         # Compile regex patterns for efficiency
         self.injection_regex = re.compile('|'.join(self.INJECTION_PATTERNS), re.IGNORECASE)
         self.off_topic_regex = re.compile('|'.join(self.OFF_TOPIC_KEYWORDS), re.IGNORECASE)
         self.role_manipulation_regex = re.compile('|'.join(self.ROLE_MANIPULATION), re.IGNORECASE)
+        
+        # Validation is a pure function of its inputs, so results are memoized per instance
+        # (lru_cache on the methods themselves would keep every sandbox alive)
+        self._validate_cached = lru_cache(maxsize=self.VALIDATION_CACHE_SIZE)(self._validate_for_key)
+        self._validate_response_cached = lru_cache(maxsize=self.VALIDATION_CACHE_SIZE)(self.validate_response)
+    
+    @staticmethod
+    def context_key(context: Optional[Dict[str, Any]]) -> str:
+        """Hashable fingerprint of a context dictionary ('' for no context)"""
+        if not context:
+            return ''
+        return json.dumps(context, sort_keys=True, separators=(',', ':'), default=str)
+    
+    def validate_and_sanitize_cached(self, user_message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[bool, str, Optional[str]]:
+        """
+        Memoized validate_and_sanitize for repeated messages.
+        
+        Args:
+            user_message: User's input message
+            context: Optional context dictionary
+        
+        Returns:
+            Tuple of (is_valid, sanitized_message, error_message)
+        """
+        if not isinstance(user_message, str):
+            return self.validate_and_sanitize(user_message, context)
+        return self._validate_cached(user_message, self.context_key(context))
+    
+    def _validate_for_key(self, user_message: str, context_key: str) -> Tuple[bool, str, Optional[str]]:
+        """validate_and_sanitize with the context passed as its context_key fingerprint"""
+        context = json.loads(context_key) if context_key else None
+        return self.validate_and_sanitize(user_message, context)
     
     def validate_and_sanitize(self, user_message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[bool, str, Optional[str]]:
         """
@@ -218,4 +255,18 @@ CRITICAL SECURITY AND BOUNDARY INSTRUCTIONS:
             return False, "Response contains inappropriate content"
         
         return True, None
+    
+    def validate_response_cached(self, response: str) -> Tuple[bool, str]:
+        """
+        Memoized validate_response for repeated responses.
+        
+        Args:
+            response: AI response text
+        
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
+        if not isinstance(response, str):
+            return self.validate_response(response)
+        return self._validate_response_cached(response)
 
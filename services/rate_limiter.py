@@ -0,0 +1,140 @@
+"""
+Rate Limiter
+Token-bucket limiter for requests-per-minute and tokens-per-minute API quotas
+"""
+
+import random
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+class TokenBucket:
+    """Bucket refilled continuously at capacity per period seconds"""
+    
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.level = capacity
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float):
+        """Add the tokens accumulated since the last refill"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (0 if available now)"""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+    
+    def take(self, amount: float):
+        """Remove amount tokens (may go negative for requests larger than the bucket)"""
+        self.level -= amount
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter.
+    
+    Callers acquire before each API request with an estimate of the tokens it will use.
+    Server-reported remaining tokens and retry-after delays are fed back with
+    update_from_headers / pause, so the local buckets never run ahead of the real quota.
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int = 8):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+    
+    def _reserve(self, estimated_tokens: int) -> float:
+        """Reserve capacity if available; otherwise return the seconds to wait before retrying"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            delay = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+            if delay > 0:
+                return delay
+            
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            return 0.0
+    
+    def acquire(self, estimated_tokens: int):
+        """Block until a request using estimated_tokens fits within both quotas"""
+        while True:
+            delay = self._reserve(estimated_tokens)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+    
+    def refund(self, tokens: float):
+        """Return over-estimated tokens once a request's actual usage is known"""
+        if tokens <= 0:
+            return
+        with self._lock:
+            self.tokens.refill(time.monotonic())
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + tokens)
+    
+    def pause(self, seconds: float):
+        """Hold all requests for seconds (e.g. after a 429 with retry-after)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def update_from_headers(self, headers: Optional[Mapping[str, Any]]):
+        """
+        Sync bucket state with rate limit headers from the API.
+        
+        Args:
+            headers: Response headers (x-ratelimit-remaining-tokens, retry-after)
+        """
+        if not headers:
+            return
+        
+        remaining_tokens = headers.get('x-ratelimit-remaining-tokens')
+        if remaining_tokens is not None:
+            try:
+                remaining = float(remaining_tokens)
+            except ValueError:
+                remaining = None
+            if remaining is not None:
+                with self._lock:
+                    self.tokens.refill(time.monotonic())
+                    self.tokens.level = min(self.tokens.level, remaining)
+        
+        retry_after = retry_after_seconds(headers)
+        if retry_after:
+            self.pause(retry_after)
+
+def retry_after_seconds(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """Parse the retry-after header (seconds) if present"""
+    if not headers:
+        return None
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Delay before retry number attempt (0-based): exponential backoff with full jitter,
+    never shorter than the server's retry-after.
+    
+    Args:
+        attempt: Retry number, starting at 0
+        retry_after: Optional server-requested delay in seconds
+        base: Initial backoff in seconds
+        cap: Maximum backoff in seconds
+    
+    Returns:
+        Delay in seconds
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    return max(delay, retry_after or 0.0)
@@ -0,0 +1,30 @@
+"""
+Time utilities shared by services
+"""
+
+import time
+
+# (second, formatted 'YYYY-MM-DDTHH:MM:SS' prefix) for the most recent call,
+# kept as one tuple so concurrent callers never see a mismatched pair
+_last_second = (0, '')
+
+def now_iso() -> str:
+    """
+    Current local time as an ISO 8601 string with microseconds.
+    
+    Equivalent to datetime.now().isoformat(), but only re-formats the date and time
+    part when the second changes.
+    
+    Returns:
+        Timestamp string, e.g. '2025-11-02T10:43:30.059658'
+    """
+    global _last_second
+    
+    ns = time.time_ns()
+    second = ns // 1_000_000_000
+    cached_second, prefix = _last_second
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+        _last_second = (second, prefix)
+    
+    return f"{prefix}.{(ns % 1_000_000_000) // 1000:06d}"
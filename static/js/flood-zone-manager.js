@@ -777,11 +777,15 @@ class FloodZoneManager {
             interactive: false
         };
 
+        // Perimeters are stored either as [[lat, lng], ...] or as { lat: [...], lng: [...] }
+        let perimeter = zone.perimeter;
+        if (perimeter && !Array.isArray(perimeter) && Array.isArray(perimeter.lat)) {
+            perimeter = perimeter.lat.map((lat, i) => [lat, perimeter.lng[i]]);
+        }
+
         // Check if zone has pre-computed perimeter from server
-        if (zone.perimeter && Array.isArray(zone.perimeter) && zone.perimeter.length > 0) {
+        if (perimeter && Array.isArray(perimeter) && perimeter.length > 0) {
             // Use pre-computed perimeter (already in lat/lng coordinates)
-            const perimeter = zone.perimeter;
-            
             // Ensure perimeter is closed (first point == last point)
             let latlngs = [...perimeter];
             if (latlngs.length > 0 && 